@@ -1,11 +1,20 @@
+import argparse
 import pygame
 import random
 import cv2
 import json
+import logging
 import math
-from src.MediPipeHandsModule.HandTrackingModule import hand_detector
-from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
-import collections
+from src.MediPipeHandsModule.HandTrackingModule import parse_size
+from src.MediPipeHandsModule.InferenceWorker import create_hand_detector
+from src.MediPipeHandsModule.GestureBackends import BACKENDS, create_evaluator
+from src.MediPipeHandsModule.CameraCapture import CameraCapture
+from src.MediPipeHandsModule.FrameSource import open_frame_source
+from src.MediPipeHandsModule.DetectionScheduler import DetectionScheduler
+from src.MediPipeHandsModule.GestureDebouncer import GestureDebouncer, STRATEGIES
+from src.MediPipeHandsModule.PredictionCache import PredictionCache
+from src.MediPipeHandsModule.GestureService import GestureService
+from src.MediPipeHandsModule.LandmarkStream import LandmarkRecorder
 
 # ============================================
 # RETRO DEATH SCREEN
@@ -282,14 +291,13 @@ class Wall(pygame.sprite.Sprite):
         self.rect.y = y
 
 class PacManGame:
-    def __init__(self, screen, cap, detector, gesture_evaluator):
+    def __init__(self, screen, gestures):
         self.screen = screen
         self.width = screen.get_width()
         self.height = screen.get_height()
-        self.cap = cap
-        self.detector = detector
-        self.gesture_evaluator = gesture_evaluator
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.gestures = gestures
+        self.last_seq = 0
+        self.last_img = None
 
         self.font = pygame.font.SysFont('courier', 36, bold=True)
         self.title_font = pygame.font.SysFont('courier', 72, bold=True)
@@ -372,26 +380,20 @@ class PacManGame:
             self.all_sprites.add(ghost)
     
     def handle_gestures(self):
-        success, img = self.cap.read()
-        if success:
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, _ = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list and bbox:
-                gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                self.recent_gestures.append(gesture[0])
-
-            if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                most_common = collections.Counter(self.recent_gestures).most_common(1)[0][0]
-
-                # 1=up, 2=left, 3=down, 4=right
-                # Queue the direction change instead of changing immediately
-                if most_common in [1, 2, 3, 4]:
-                    self.player.next_direction = most_common
-
-        return success, img if success else None
+        # The gesture service publishes a new state per processed camera frame
+        state = self.gestures.latest()
+        if state is not None and state.seq != self.last_seq:
+            self.last_seq = state.seq
+            gesture = state.gesture
+
+            # 1=up, 2=left, 3=down, 4=right
+            # Queue the direction change instead of changing immediately
+            if gesture in [1, 2, 3, 4]:
+                self.player.next_direction = gesture
+
+            self.last_img = state.preview
+
+        return self.last_img is not None, self.last_img
     
     def draw_scanline(self):
         for i in range(0, self.height, 4):
@@ -603,14 +605,14 @@ class PowerUp(pygame.sprite.Sprite):
             self.kill()
 
 class BreakoutGame:
-    def __init__(self, screen, cap, detector, gesture_evaluator):
+    def __init__(self, screen, gestures):
         self.screen = screen
         self.width = screen.get_width()
         self.height = screen.get_height()
-        self.cap = cap
-        self.detector = detector
-        self.gesture_evaluator = gesture_evaluator
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.gestures = gestures
+        self.last_seq = 0
+        self.last_img = None
+        self.current_gesture = None
 
         self.font = pygame.font.SysFont('courier', 36, bold=True)
 
@@ -655,26 +657,20 @@ class BreakoutGame:
                 self.all_sprites.add(brick)
     
     def handle_gestures(self, dt):
-        success, img = self.cap.read()
-        if success:
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, _ = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list and bbox:
-                gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                self.recent_gestures.append(gesture[0])
-
-            if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                most_common = collections.Counter(self.recent_gestures).most_common(1)[0][0]
-
-                if most_common == 2:  # Left
-                    self.paddle.move_left(dt)
-                elif most_common == 4:  # Right
-                    self.paddle.move_right(dt)
-
-        return success, img if success else None
+        # The gesture service publishes a new state per processed camera frame
+        state = self.gestures.latest()
+        if state is not None and state.seq != self.last_seq:
+            self.last_seq = state.seq
+            self.current_gesture = state.gesture
+            self.last_img = state.preview
+
+        # Keep applying the last gesture on ticks between camera frames
+        if self.current_gesture == 2:  # Left
+            self.paddle.move_left(dt)
+        elif self.current_gesture == 4:  # Right
+            self.paddle.move_right(dt)
+
+        return self.last_img is not None, self.last_img
     
     def draw_scanline(self):
         for i in range(0, self.height, 4):
@@ -966,14 +962,14 @@ class Platform(pygame.sprite.Group):
                     self.add(block)
 
 class SpaceInvadersGame:
-    def __init__(self, screen, cap, detector, gesture_evaluator):
+    def __init__(self, screen, gestures):
         self.screen = screen
         self.width = screen.get_width()
         self.height = screen.get_height()
-        self.cap = cap
-        self.detector = detector
-        self.gesture_evaluator = gesture_evaluator
-        self.recent_gestures = collections.deque(maxlen=5)
+        self.gestures = gestures
+        self.last_seq = 0
+        self.last_img = None
+        self.current_gesture = None
         
         self.font = pygame.font.SysFont('courier', 36, bold=True)
         self.title_font = pygame.font.SysFont('courier', 72, bold=True)
@@ -1030,28 +1026,22 @@ class SpaceInvadersGame:
                 self.aliens.add(alien)
     
     def handle_gestures(self, dt, current_time):
-        success, img = self.cap.read()
-        if success:
-            img = cv2.flip(img, 1)
-            img = self.detector.find_hands(img)
-            lm_list, bbox, _ = self.detector.get_bbox_location(img)
-            handedness_list = self.detector.get_handedness()
-
-            if lm_list and handedness_list and bbox:
-                gesture = self.gesture_evaluator.evaluate(lm_list, handedness_list[0], bbox)
-                self.recent_gestures.append(gesture[0])
-
-            if len(self.recent_gestures) == self.recent_gestures.maxlen:
-                most_common = collections.Counter(self.recent_gestures).most_common(1)[0][0]
-
-                if most_common == 2:  # Left
-                    self.player.move_left(dt)
-                elif most_common == 4:  # Right
-                    self.player.move_right(dt)
-                elif most_common == 1:  # Shoot
-                    self.player.shoot(self.all_sprites, self.bullets, current_time)
-
-        return success, img if success else None
+        # The gesture service publishes a new state per processed camera frame
+        state = self.gestures.latest()
+        if state is not None and state.seq != self.last_seq:
+            self.last_seq = state.seq
+            self.current_gesture = state.gesture
+            self.last_img = state.preview
+
+        # Keep applying the last gesture on ticks between camera frames
+        if self.current_gesture == 2:  # Left
+            self.player.move_left(dt)
+        elif self.current_gesture == 4:  # Right
+            self.player.move_right(dt)
+        elif self.current_gesture == 1:  # Shoot
+            self.player.shoot(self.all_sprites, self.bullets, current_time)
+
+        return self.last_img is not None, self.last_img
     
     def draw_scanline(self):
         for i in range(0, self.height, 4):
@@ -1188,7 +1178,9 @@ class SpaceInvadersGame:
 # ============================================
 
 class GameMenu:
-    def __init__(self):
+    def __init__(self, out_of_process_detection=False, inference_size=None, roi_tracking=False,
+                 detection_rate=None, source=0, record=None, debounce="ema", cache_tolerance=None,
+                 backend="forest", model_path=None, landmarks=None, stats=False):
         pygame.init()
         
         self.info = pygame.display.Info()
@@ -1201,9 +1193,25 @@ class GameMenu:
         self.menu_font = pygame.font.SysFont('courier', 48, bold=True)
         self.font = pygame.font.SysFont('courier', 36, bold=True)
         
-        self.cap = cv2.VideoCapture(0)
-        self.detector = hand_detector(max_hands=1, track_con=0.8)
-        self.gesture_evaluator = GestureEvaluator("models/gesture_model.pkl")
+        # Capture runs paused while the menu is up and is resumed per game.
+        # Files replay at their recorded pace and loop, like a camera would
+        frame_source = open_frame_source(source, realtime=True, loop=True, record=record)
+        self.capture = CameraCapture(frame_source).start(paused=True)
+        self.detector = create_hand_detector(out_of_process=out_of_process_detection,
+                                             max_hands=1, track_con=0.8,
+                                             inference_size=inference_size,
+                                             roi_tracking=roi_tracking)
+        if detection_rate:
+            self.detector = DetectionScheduler(self.detector, target_rate=detection_rate)
+        self.gesture_evaluator = create_evaluator(backend, model_path)
+        if cache_tolerance:
+            self.gesture_evaluator = PredictionCache(self.gesture_evaluator, tolerance=cache_tolerance)
+        self.debounce = debounce
+        self.stats = stats
+        self.landmark_recorder = LandmarkRecorder(landmarks, max_hands=1) if landmarks else None
+        # Runs capture-to-gesture off the render loop; idle while capture is paused
+        self.gesture_service = GestureService(self.capture, self.detector, self.gesture_evaluator,
+                                              landmark_recorder=self.landmark_recorder).start()
         
         self.menu_items = [
             "1. PAC-MAN MAZE",
@@ -1216,6 +1224,24 @@ class GameMenu:
     def draw_scanline(self):
         for i in range(0, self.height, 4):
             pygame.draw.line(self.screen, (10, 10, 10), (0, i), (self.width, i), 1)
+
+    def play(self, game_class):
+        debouncer = GestureDebouncer(self.gesture_evaluator.classes, strategy=self.debounce)
+        self.gesture_service.reset(debouncer)
+        # Drop frames that piled up in the driver while the menu was shown
+        self.capture.resume(drain=True)
+        try:
+            return game_class(self.screen, self.gesture_service).run()
+        finally:
+            self.capture.pause()
+            if self.stats:
+                self.print_stats(debouncer)
+
+    def print_stats(self, debouncer):
+        print(f"gesture debouncer: {debouncer.stats()}")
+        print(f"gesture service: {self.gesture_service.stats()}")
+        if isinstance(self.gesture_evaluator, PredictionCache):
+            print(f"prediction cache: {self.gesture_evaluator.stats()}")
         
     def draw_menu(self):
         self.screen.fill((0, 0, 0))
@@ -1285,18 +1311,15 @@ class GameMenu:
                     if event.key == pygame.K_q:
                         running = False
                     elif event.key == pygame.K_1:
-                        result = PacManGame(self.screen, self.cap, self.detector, 
-                                          self.gesture_evaluator).run()
+                        result = self.play(PacManGame)
                         if result == "quit":
                             running = False
                     elif event.key == pygame.K_2:
-                        result = BreakoutGame(self.screen, self.cap, self.detector, 
-                                            self.gesture_evaluator).run()
+                        result = self.play(BreakoutGame)
                         if result == "quit":
                             running = False
                     elif event.key == pygame.K_3:
-                        result = SpaceInvadersGame(self.screen, self.cap, self.detector, 
-                                                  self.gesture_evaluator).run()
+                        result = self.play(SpaceInvadersGame)
                         if result == "quit":
                             running = False
                     elif event.key == pygame.K_UP:
@@ -1305,18 +1328,15 @@ class GameMenu:
                         self.selected = (self.selected + 1) % len(self.menu_items)
                     elif event.key == pygame.K_RETURN:
                         if self.selected == 0:
-                            result = PacManGame(self.screen, self.cap, self.detector, 
-                                              self.gesture_evaluator).run()
+                            result = self.play(PacManGame)
                             if result == "quit":
                                 running = False
                         elif self.selected == 1:
-                            result = BreakoutGame(self.screen, self.cap, self.detector, 
-                                                self.gesture_evaluator).run()
+                            result = self.play(BreakoutGame)
                             if result == "quit":
                                 running = False
                         elif self.selected == 2:
-                            result = SpaceInvadersGame(self.screen, self.cap, self.detector, 
-                                                      self.gesture_evaluator).run()
+                            result = self.play(SpaceInvadersGame)
                             if result == "quit":
                                 running = False
                         elif self.selected == 3:
@@ -1325,9 +1345,59 @@ class GameMenu:
             self.draw_menu()
             clock.tick(60)
         
-        self.cap.release()
+        self.gesture_service.stop()
+        if self.landmark_recorder:
+            self.landmark_recorder.close()
+        self.capture.release()
+        self.detector.close()
         pygame.quit()
 
 if __name__ == "__main__":
-    menu = GameMenu()
+    parser = argparse.ArgumentParser(description="Retro gesture games")
+    parser.add_argument("--detector", choices=["local", "process"], default="local",
+                        help="run hand detection in this process or in a worker process")
+    parser.add_argument("--inference-size", type=parse_size, default=None, metavar="WxH",
+                        help="downscale frames to this size for hand detection, e.g. 320x240")
+    parser.add_argument("--roi-tracking", action="store_true",
+                        help="detect in a crop around the last hand position instead of the whole frame")
+    parser.add_argument("--detection-rate", type=float, default=None, metavar="HZ",
+                        help="run full hand detection at most this often and only on motion")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file or recorded .frames file")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="also append every camera frame to this .frames file")
+    parser.add_argument("--landmarks", default=None, metavar="PATH",
+                        help="append every processed frame's landmarks to this .landmarks stream file")
+    parser.add_argument("--stats", action="store_true",
+                        help="print debouncer, gesture service and prediction cache stats after each game")
+    parser.add_argument("--debounce", choices=STRATEGIES, default="ema",
+                        help="how per-frame gesture probabilities are smoothed into game input")
+    parser.add_argument("--cache-tolerance", type=float, default=None, metavar="DIST",
+                        help="reuse the last prediction while features move less than this")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="forest",
+                        help="gesture classifier backend")
+    parser.add_argument("--model", default=None, metavar="PATH",
+                        help="model file for the backend instead of its default")
+    args = parser.parse_args()
+    # Recorder totals and background-thread errors are reported through logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        # Evaluators load lazily, so this only checks the backend and model
+        # before the game takes over the screen
+        create_evaluator(args.backend, args.model)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+    menu = GameMenu(out_of_process_detection=args.detector == "process",
+                    inference_size=args.inference_size,
+                    roi_tracking=args.roi_tracking,
+                    detection_rate=args.detection_rate,
+                    source=args.source,
+                    record=args.record,
+                    debounce=args.debounce,
+                    cache_tolerance=args.cache_tolerance,
+                    backend=args.backend,
+                    model_path=args.model,
+                    landmarks=args.landmarks,
+                    stats=args.stats)
     menu.run()
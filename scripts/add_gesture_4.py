@@ -1,20 +1,47 @@
-
+import argparse
 import csv
+import os
+import sys
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.GestureAugment import mirror
+from src.MediPipeHandsModule.GestureDataset import parse_gesture_csv
+from src.MediPipeHandsModule.LandmarkFeatures import NUM_LANDMARK_FEATURES, NUM_LANDMARKS
+
+# train.py --augment mirrors on the fly without writing anything; this script
+# is for when a mirrored gesture should exist as captured rows.
 
-def mirror_gesture(input_file, output_file):
-    with open(input_file, 'r') as infile, open(output_file, 'a', newline='') as outfile:
-        reader = csv.reader(infile)
+
+def mirror_gesture(input_file, output_file, source_label=2, target_label=4):
+    """
+    Writes every source_label row of input_file, mirrored and relabelled
+    target_label, to output_file. Hand codes are kept.
+    """
+    if os.path.abspath(input_file) == os.path.abspath(output_file):
+        raise ValueError('write the mirrored rows to a new file; appending to the input doubles them on every run')
+    labels, handedness, landmarks = parse_gesture_csv(input_file)
+    rows = labels == source_label
+    mirrored = mirror(landmarks[rows].reshape(-1, NUM_LANDMARKS, 2)).reshape(-1, NUM_LANDMARK_FEATURES)
+
+    with open(output_file, 'w', newline='') as outfile:
         writer = csv.writer(outfile)
+        hands = np.where(handedness[rows] == 1, 'right', 'left')
+        for hand, values in zip(hands, mirrored.tolist()):
+            prefix = [target_label] if handedness[0] < 0 else [target_label, hand]
+            writer.writerow(prefix + values)
+    return int(rows.sum())
 
-        for row in reader:
-            if row and row[0] == '2':
-                new_row = ['4'] + row[1:]
-                for i in range(2, len(new_row), 2):
-                    try:
-                        new_row[i] = str(-float(new_row[i]))
-                    except (ValueError, IndexError):
-                        pass
-                writer.writerow(new_row)
 
 if __name__ == '__main__':
-    mirror_gesture('/home/kr3915/Projects/MediaControl/data/numbers/gestures.csv', '/home/kr3915/Projects/MediaControl/data/numbers/gestures.csv')
+    parser = argparse.ArgumentParser(description='Make gesture 4 rows by mirroring gesture 2 rows')
+    parser.add_argument('input', nargs='?', default=os.path.join(project_root, 'data', 'numbers', 'gestures.csv'))
+    parser.add_argument('--out', default=None, help='defaults to <input>_mirrored.csv')
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.input)[0] + '_mirrored.csv'
+    print(f'wrote {mirror_gesture(args.input, out)} mirrored rows to {out}')
@@ -0,0 +1,116 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import warnings
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.GestureBackends import evaluator_for_file
+from src.MediPipeHandsModule.GestureDataset import load_features
+from src.MediPipeHandsModule.InferenceTiming import latencies_us
+from src.MediPipeHandsModule.LandmarkFeatures import NUM_FEATURES
+
+# Import the model libraries up front so load times measure the models only
+import sklearn.ensemble  # noqa: F401
+import torch  # noqa: F401
+
+
+def adapt_features(X, n_features):
+    """
+    Fits the 43-column features to what a model was trained on: 42-column
+    models take the landmarks without handedness. Returns None for layouts
+    the data cannot provide (e.g. 84-column two-hand models).
+    """
+    if n_features == NUM_FEATURES:
+        return X
+    if n_features == NUM_FEATURES - 1:
+        return X[:, 1:]
+    return None
+
+
+def confusion_matrix(y_true, y_pred, labels):
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)), dtype=int)
+    for true, pred in zip(y_true.tolist(), y_pred.tolist()):
+        matrix[index[true], index[pred]] += 1
+    return matrix
+
+
+def bench(path, X, y, repeat):
+    evaluator = evaluator_for_file(path)
+    start = time.perf_counter()
+    evaluator.model
+    load_ms = (time.perf_counter() - start) * 1000
+
+    features = adapt_features(X, evaluator.n_features)
+    if features is None:
+        return {'model': os.path.basename(path), 'load_ms': load_ms,
+                'skipped': f'expects {evaluator.n_features} features, data has {NUM_FEATURES}'}
+
+    labels, _ = evaluator.evaluate_batch(features)
+    times = latencies_us(evaluator.evaluate_batch, features, repeat)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        evaluator.evaluate_batch(features)
+    throughput = len(features) * repeat / (time.perf_counter() - start)
+
+    return {
+        'model': os.path.basename(path),
+        'load_ms': load_ms,
+        'accuracy': float(np.mean(labels == y)),
+        'p50_us': np.percentile(times, 50),
+        'p95_us': np.percentile(times, 95),
+        'p99_us': np.percentile(times, 99),
+        'throughput': throughput,
+        'predicted': labels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accuracy and speed of every gesture model side by side')
+    parser.add_argument('--models', nargs='+', default=None,
+                        help='model files (defaults to every .pkl and .gmodel in models/)')
+    parser.add_argument('--data', default=os.path.join(project_root, 'data', 'retro', 'gestures_blind.csv'))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.models or sorted(glob.glob(os.path.join(project_root, 'models', '*.pkl')) +
+                                  glob.glob(os.path.join(project_root, 'models', '*.gmodel')))
+    X, y = load_features(args.data)
+    print(f'{len(y)} samples from {args.data}')
+
+    results = []
+    with warnings.catch_warnings():
+        # Old pickles warn about the sklearn version; named-feature models about bare arrays
+        warnings.simplefilter('ignore')
+        for path in paths:
+            results.append(bench(path, X, y, args.repeat))
+
+    print(f'\n{"model":>28} {"load ms":>9} {"accuracy":>9} {"p50 us":>9} {"p95 us":>9} {"p99 us":>9} {"batch/s":>10}')
+    for r in results:
+        if 'skipped' in r:
+            print(f'{r["model"]:>28} {r["load_ms"]:9.1f}  skipped: {r["skipped"]}')
+            continue
+        print(f'{r["model"]:>28} {r["load_ms"]:9.1f} {r["accuracy"]:9.3f} {r["p50_us"]:9.1f} '
+              f'{r["p95_us"]:9.1f} {r["p99_us"]:9.1f} {r["throughput"]:10.0f}')
+
+    for r in results:
+        if 'skipped' in r:
+            continue
+        labels = sorted(set(y.tolist()) | set(r['predicted'].tolist()))
+        matrix = confusion_matrix(y, r['predicted'], labels)
+        print(f'\n{r["model"]} confusion (rows true, columns predicted)')
+        print('      ' + ''.join(f'{label:>6}' for label in labels))
+        for label, row in zip(labels, matrix):
+            print(f'{label:>6}' + ''.join(f'{count:6d}' for count in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import torch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CNNModel import CNN
+from src.MediPipeHandsModule.GestureDataset import load_dataset
+from src.MediPipeHandsModule.GestureEvaluatorCNN import GestureEvaluatorCNN
+
+# train_cnn.py pickled the model from its own __main__
+sys.modules['__main__'].CNN = CNN
+
+
+def load_hands(path):
+    """
+    Rebuilds find_position-style landmark lists and bboxes from the
+    normalized training rows: wrist at (0, 0) and a 1000x1000 bbox give
+    back the same normalized features.
+    """
+    dataset, _ = load_dataset(path)
+    xy = np.rint(np.asarray(dataset.landmarks).reshape(-1, 21, 2) * 1000).astype(int)
+    hands = []
+    for code, points in zip(dataset.handedness.tolist(), xy):
+        lm_list = [[id, x, y] for id, (x, y) in enumerate(points.tolist())]
+        hands.append((lm_list, int(code), (0, 0, 1000, 1000)))
+    return hands
+
+
+def run(evaluator, hands, repeat):
+    # Warm up (loads, traces and quantizes) outside the timing
+    evaluator.evaluate(*hands[0])
+    times = []
+    labels = []
+    for _ in range(repeat):
+        labels = []
+        for hand in hands:
+            start = time.perf_counter()
+            labels.append(evaluator.evaluate(*hand)[0])
+            times.append((time.perf_counter() - start) * 1e6)
+    return np.array(times), np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-hand latency of GestureEvaluatorCNN configurations')
+    parser.add_argument('--model', default=os.path.join(project_root, 'models', 'gesture_model_cnn.gmodel'))
+    parser.add_argument('--data', default=os.path.join(project_root, 'data', 'retro', 'gestures.csv'))
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    hands = load_hands(args.data)[:args.samples]
+    default_threads = torch.get_num_threads()
+    configs = [
+        ('current', dict(num_threads=default_threads)),
+        ('fast, default threads', dict(fast=True, num_threads=default_threads)),
+        ('fast, 1 thread', dict(fast=True, num_threads=1)),
+        ('fast int8, 1 thread', dict(quantize=True, num_threads=1)),
+    ]
+
+    print(f'{len(hands)} hands x {args.repeat}')
+    print(f'{"configuration":>22} {"p50 us":>9} {"p99 us":>9} {"agree":>7}')
+    baseline = None
+    for name, kwargs in configs:
+        times, labels = run(GestureEvaluatorCNN(args.model, **kwargs), hands, args.repeat)
+        if baseline is None:
+            baseline = labels
+        print(f'{name:>22} {np.percentile(times, 50):9.1f} {np.percentile(times, 99):9.1f} '
+              f'{np.mean(labels == baseline):7.3f}')
+    torch.set_num_threads(default_threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import time
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.FrameSource import open_frame_source
+from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+from src.MediPipeHandsModule.InferenceWorker import ProcessHandDetector
+
+
+def load_frames(source, count):
+    cap = open_frame_source(source)
+    frames = []
+    while len(frames) < count:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(cv2.flip(img, 1))
+    cap.release()
+    return frames
+
+
+def busy_wait(seconds):
+    # Stand-in for game simulation and rendering, which keeps a core busy
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(detector, frames, render_ms):
+    detected = 0
+    start = time.perf_counter()
+    for img in frames:
+        detector.find_hands(img.copy())
+        if len(detector.landmarks):
+            detected += 1
+        busy_wait(render_ms / 1000.0)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, detected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare in-process and worker-process hand detection')
+    parser.add_argument('--source', default='0', help='camera index, video file or recorded .frames file')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--render-ms', type=float, default=8.0,
+                        help='simulated per-frame game work in milliseconds')
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print(f'no frames read from {args.source}')
+        return
+    print(f'{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, '
+          f'{args.render_ms:.1f} ms simulated render per frame')
+
+    detector = hand_detector(max_hands=1, track_con=0.8)
+    fps, detected = run(detector, frames, args.render_ms)
+    detector.close()
+    print(f'in-process:               {fps:7.1f} fps  ({detected} frames with hands)')
+
+    for wait in (True, False):
+        detector = ProcessHandDetector(max_hands=1, track_con=0.8, wait=wait)
+        # First frame starts the worker; keep that out of the timing
+        detector.find_hands(frames[0].copy())
+        detector._collect(block=True)
+        warmup = detector.frames_processed
+        fps, detected = run(detector, frames, args.render_ms)
+        detector._collect(block=True)
+        processed = detector.frames_processed - warmup
+        detector.close()
+        label = 'worker process (sync):' if wait else 'worker process (async):'
+        print(f'{label:25s} {fps:7.1f} fps  ({detected} frames with hands, '
+              f'{processed} of {len(frames)} frames run through MediaPipe)')
+
+
+if __name__ == '__main__':
+    main()
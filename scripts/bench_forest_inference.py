@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+import joblib
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CompiledForest import compile_forest
+from src.MediPipeHandsModule.GestureDataset import load_features
+from src.MediPipeHandsModule.InferenceTiming import latencies_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-sample latency of sklearn and compiled forest inference')
+    parser.add_argument('--model', default=os.path.join(project_root, 'models', 'gesture_model.pkl'))
+    parser.add_argument('--data', default=os.path.join(project_root, 'data', 'retro', 'gestures_blind.csv'))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    start = time.perf_counter()
+    compiled = compile_forest(model)
+    compile_ms = (time.perf_counter() - start) * 1000
+    X, y = load_features(args.data)
+
+    expected = model.predict(X)
+    identical = np.array_equal(compiled.predict(X), expected)
+    single = all(compiled.predict(row.reshape(1, -1))[0] == label for row, label in zip(X, expected))
+    print(f'{len(model.estimators_)} trees, {len(compiled.feature)} nodes, depth {compiled.depth}, '
+          f'compiled in {compile_ms:.1f} ms')
+    print(f'{len(X)} samples, labels identical to sklearn: {identical and single}, '
+          f'accuracy {np.mean(expected == y):.3f}')
+
+    print(f'{"backend":>10} {"p50 us":>10} {"p99 us":>10} {"mean us":>10}')
+    for name, predict in (('sklearn', model.predict), ('compiled', compiled.predict)):
+        times = latencies_us(predict, X, args.repeat)
+        print(f'{name:>10} {np.percentile(times, 50):10.1f} {np.percentile(times, 99):10.1f} {times.mean():10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+from google.protobuf.json_format import MessageToDict
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.HandTrackingModule import hand_detector, handedness_from_results
+
+
+def make_results(num_hands):
+    """
+    Builds MediaPipe-shaped results with num_hands hands, like Hands.process returns.
+    """
+    multi_hand_landmarks = []
+    multi_handedness = []
+    for index in range(num_hands):
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for id in range(21):
+            landmark_list.landmark.add(x=0.5 + id * 0.01, y=0.5 - id * 0.01, z=-0.01 * id)
+        multi_hand_landmarks.append(landmark_list)
+        classification_list = classification_pb2.ClassificationList()
+        classification_list.classification.add(index=index, label=('Right', 'Left')[index % 2], score=0.97)
+        multi_handedness.append(classification_list)
+    return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
+
+
+def message_to_dict_handedness(results):
+    # The previous get_handedness implementation
+    handedness_list = []
+    if results.multi_hand_landmarks and results.multi_handedness:
+        for hand_handedness in results.multi_handedness:
+            handedness_dict = MessageToDict(hand_handedness)
+            handedness_list.append(handedness_dict['classification'][0]['label'])
+    return handedness_list
+
+
+def per_call_us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-frame cost of reading handedness from MediaPipe results')
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    detector = hand_detector(max_hands=2)
+    print(f'{"hands":>5} {"MessageToDict us":>17} {"direct us":>10} {"saving us":>10}')
+    for num_hands in (1, 2):
+        results = make_results(num_hands)
+        old = per_call_us(lambda: message_to_dict_handedness(results), args.number)
+        new = per_call_us(lambda: detector.set_handedness(*handedness_from_results(results)), args.number)
+        print(f'{num_hands:5d} {old:17.2f} {new:10.2f} {old - new:10.2f}')
+    detector.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.FrameSource import open_frame_source
+from src.MediPipeHandsModule.HandTrackingModule import hand_detector, parse_size
+
+
+def load_frames(source, count):
+    cap = open_frame_source(source)
+    frames = []
+    while len(frames) < count:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(cv2.flip(img, 1))
+    cap.release()
+    return frames
+
+
+def detect_all(frames, inference_size):
+    """
+    Runs a fresh detector over every frame and returns per-frame latencies
+    in milliseconds and full-frame landmark arrays (None when no hand).
+    """
+    detector = hand_detector(max_hands=1, track_con=0.8, inference_size=inference_size)
+    latencies = []
+    landmarks = []
+    for img in frames:
+        start = time.perf_counter()
+        detector.find_hands(img, draw=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hand = detector.get_landmark_array(0)
+        landmarks.append(hand[:, :2].copy() if hand is not None else None)
+    detector.close()
+    return np.array(latencies), landmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detection latency and landmark drift per inference resolution')
+    parser.add_argument('--source', default='0', help='camera index, video file or recorded .frames file')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--sizes', nargs='+', type=parse_size,
+                        default=[(640, 480), (480, 360), (320, 240), (256, 256)], metavar='WxH')
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print(f'no frames read from {args.source}')
+        return
+    full_h, full_w = frames[0].shape[:2]
+    print(f'{len(frames)} frames at {full_w}x{full_h}')
+
+    base_latency, base_landmarks = detect_all(frames, None)
+    print(f'{"size":>10} {"p50 ms":>8} {"p95 ms":>8} {"hands":>6} {"drift px":>9} {"max px":>8}')
+    print(f'{"full":>10} {np.percentile(base_latency, 50):8.2f} {np.percentile(base_latency, 95):8.2f} '
+          f'{sum(lm is not None for lm in base_landmarks):6d} {"-":>9} {"-":>8}')
+
+    for size in args.sizes:
+        latency, landmarks = detect_all(frames, size)
+        # Drift is measured only on frames where both runs found a hand
+        drift = [np.linalg.norm(lm - base, axis=1)
+                 for lm, base in zip(landmarks, base_landmarks)
+                 if lm is not None and base is not None]
+        mean_drift = f'{np.mean(drift):9.2f}' if drift else f'{"-":>9}'
+        max_drift = f'{np.max(drift):8.2f}' if drift else f'{"-":>8}'
+        print(f'{size[0]:>4}x{size[1]:<5} {np.percentile(latency, 50):8.2f} {np.percentile(latency, 95):8.2f} '
+              f'{sum(lm is not None for lm in landmarks):6d} {mean_drift} {max_drift}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import warnings
+import joblib
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CompiledKNN import KNN_INDEXES, compile_knn
+from src.MediPipeHandsModule.GestureDataset import load_features
+from src.MediPipeHandsModule.InferenceTiming import latencies_us
+
+
+def grow(X, y, size, rng):
+    """
+    Stands in for a larger gestures.csv: copies of the rows with small
+    landmark jitter (handedness left alone).
+    """
+    picks = rng.integers(len(X), size=size)
+    grown = X[picks].copy()
+    grown[:, 1:] += rng.normal(0.0, 0.01, size=grown[:, 1:].shape)
+    return grown, y[picks]
+
+
+def single_sample_us(predict_proba, queries):
+    times = latencies_us(predict_proba, queries)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def report(name, model, queries, reference):
+    p50, p99 = single_sample_us(model.predict_proba, queries)
+    agree = np.mean(model.predict(queries) == reference)
+    print(f'{name:>22} {p50:9.1f} {p99:9.1f} {agree:7.3f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-sample latency of the KNN gesture model per index')
+    parser.add_argument('--model', default=os.path.join(project_root, 'models', 'gesture_model_knn.pkl'))
+    parser.add_argument('--data', default=os.path.join(project_root, 'data', 'retro', 'gestures.csv'))
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 20000],
+                        help='synthetic training set sizes to show scaling')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    X, y = load_features(args.data)
+    queries = X[:args.queries]
+    header = f'{"index":>22} {"p50 us":>9} {"p99 us":>9} {"agree":>7}'
+
+    model = joblib.load(args.model)
+    reference = model.predict(queries)
+    print(f'{args.model}: {len(model._fit_X)} training points, k={model.n_neighbors}')
+    print(header)
+    report('sklearn', model, queries, reference)
+    for index in KNN_INDEXES:
+        report(index, compile_knn(model, index), queries, reference)
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        train_X, train_y = grow(X, y, size, rng)
+        model = KNeighborsClassifier(n_neighbors=5).fit(train_X, train_y)
+        reference = model.predict(queries)
+        print(f'\n{size} synthetic training points')
+        print(header)
+        report('sklearn', model, queries, reference)
+        for index in KNN_INDEXES:
+            report(index, compile_knn(model, index), queries, reference)
+
+
+if __name__ == '__main__':
+    main()
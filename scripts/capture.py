@@ -1,8 +1,10 @@
+import argparse
 import cv2
 import time 
 import os
 import sys
 import csv
+import logging
 
 #get path to src
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,36 +15,54 @@ data_path = os.path.join(project_root, 'data')
 
 if src_path not in sys.path:
     sys.path.append(src_path)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 try:
-    from MediPipeHandsModule.HandTrackingModule import hand_detector
+    from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+    from src.MediPipeHandsModule.FrameSource import open_frame_source
+    from src.MediPipeHandsModule.LandmarkStream import LandmarkRecorder
+    from src.MediPipeHandsModule.LandmarkFeatures import features_from_lm_list
+    from src.MediPipeHandsModule.OnlineModel import OnlineGestureModel
 except ImportError as e:
     print(f'error importing HandTrackingModule: {e}')
 
-def normalize_landmarks(lm_list, bbox, handedness):
-    normalized_landmarks = []
-    if len(lm_list) != 0 and bbox:
-        wrist = lm_list[0]  # Wrist is the first landmark
-        bbox_width = bbox[2]
-        bbox_height = bbox[3]
-        for joint in lm_list:
-            try:
-                # Get relative position to the wrist and scale by bbox dimensions
-                normalized_x = (joint[1] - wrist[1]) / bbox_width
-                normalized_y = (joint[2] - wrist[2]) / bbox_height
-                normalized_landmarks.append((normalized_x, normalized_y))
-            except (TypeError, IndexError, ZeroDivisionError) as e:
-                print(f"Error processing joint: {joint}, error: {e}")
-    return normalized_landmarks
-    
 def write_data(data, hand, number):
     with open (data_path+'/retro/gestures.csv', 'a') as f:
         wr = csv.writer(f)
-        wr.writerow([number, hand.lower()] + [item for sublist in data for item in sublist])
+        wr.writerow([number, hand.lower()] + data)
 
 def main():
-    cap = cv2.VideoCapture(0)
+    parser = argparse.ArgumentParser(description='Capture labelled gesture landmarks')
+    parser.add_argument('--source', default='0',
+                        help='camera index, video file or recorded .frames file')
+    parser.add_argument('--record', default=None, metavar='PATH',
+                        help='also append every frame read to this .frames file for later replay')
+    parser.add_argument('--landmarks', default=None, metavar='PATH',
+                        help="append every frame's landmarks to this .landmarks stream file")
+    parser.add_argument('--online', nargs='?', default=None, metavar='PATH',
+                        const=os.path.join(project_root, 'models', 'gesture_model_online.gmodel'),
+                        help='also fold each capture into this KNN model and republish it for a game '
+                             'running --backend online (default models/gesture_model_online.gmodel)')
+    parser.add_argument('--online-base', default=os.path.join(project_root, 'models', 'gesture_model_knn.gmodel'),
+                        help='KNN model the online model starts from when it does not exist yet')
+    parser.add_argument('--online-reset', action='store_true',
+                        help='start the online model over from --online-base')
+    parser.add_argument('--publish-interval', type=float, default=0.0,
+                        help='least seconds between republishing the online model')
+    args = parser.parse_args()
+    # Recorder totals and errors are reported through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    cap = open_frame_source(args.source, record=args.record)
     detector = hand_detector()
+    landmark_recorder = LandmarkRecorder(args.landmarks) if args.landmarks else None
+    online = None
+    if args.online:
+        online = OnlineGestureModel(args.online, args.online_base, args.publish_interval,
+                                    resume=not args.online_reset)
+        print(f'online model {args.online}: {len(online)} samples from {online.source}')
+    features_to_save = None
     pTime = 0
     landmarks_to_save = []
     hand_to_save = None
@@ -50,14 +70,20 @@ def main():
     # main loop
     while True:
         success, img = cap.read()
+        if not success and not args.source.isdigit():
+            # End of a video or recorded file
+            break
 
         if success:
             img = cv2.flip(img, 1)
             img = detector.find_hands(img)
+            if landmark_recorder:
+                landmark_recorder.write(detector, img.shape, cap.timestamp)
             handedness = detector.get_handedness()
 
             landmarks_to_save = []
             hand_to_save = None
+            features_to_save = None
 
             if handedness:
                 # Only process the first detected hand
@@ -65,10 +91,11 @@ def main():
                 lm_list, bbox, mid = detector.get_bbox_location(img, hand_no=0)
                 if len(lm_list) != 0 and bbox:
                     img = cv2.putText(img, hand, (bbox[0] + bbox[2] + 10, bbox[1] + 20), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-                    normalized_landmarks = normalize_landmarks(lm_list, bbox, hand)
-                    if normalized_landmarks:
-                        landmarks_to_save = normalized_landmarks
+                    features = features_from_lm_list(lm_list, bbox, detector.handedness_codes[0])
+                    if features is not None:
+                        landmarks_to_save = features[0, 1:].tolist()
                         hand_to_save = hand
+                        features_to_save = features[0]
 
             cv2.imshow('hand capture', img)
             key = cv2.waitKey(1) & 0xFF
@@ -83,10 +110,20 @@ def main():
                 if landmarks_to_save and hand_to_save:
                     write_data(landmarks_to_save, hand_to_save, num)
                     print(f"Saved {hand_to_save} hand data for number {num}")
+                    if online:
+                        start = time.perf_counter()
+                        published = online.add(features_to_save, num)
+                        elapsed = (time.perf_counter() - start) * 1000
+                        state = 'published' if published else 'pending'
+                        print(f'  online model: {len(online)} samples, {state} in {elapsed:.1f} ms')
                 else:
                     print('no landmarks to save')
 
     cap.release()
+    if online:
+        online.close()
+    if landmark_recorder:
+        landmark_recorder.close()
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
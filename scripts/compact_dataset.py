@@ -0,0 +1,123 @@
+import argparse
+import collections
+import csv
+import os
+import sys
+import time
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.GestureDataset import GestureCsvReader, NearDuplicateFilter
+
+
+def range_problems(labels, landmarks, limit, allowed_labels):
+    """
+    Vectorized range checks on a parsed chunk. Returns one reason string
+    per row, None for rows that pass.
+    """
+    reasons = np.full(len(labels), None, dtype=object)
+    # Later checks overwrite earlier ones; the order is least to most specific
+    reasons[np.abs(landmarks).max(axis=1, initial=0.0) > limit] = f'landmark outside +-{limit}'
+    reasons[np.abs(landmarks).max(axis=1, initial=0.0) == 0.0] = 'every landmark at the wrist'
+    reasons[np.abs(landmarks[:, :2]).max(axis=1, initial=0.0) > 0.0] = 'wrist not at the origin'
+    if allowed_labels is not None:
+        reasons[~np.isin(labels, allowed_labels)] = 'unknown label'
+    return reasons
+
+
+def format_row(label, hand, values, has_hand):
+    row = [int(label)]
+    if has_hand:
+        row.append('right' if hand == 1 else 'left')
+    return row + values
+
+
+def compact(path, out, resolution, grids, limit, allowed_labels, chunk_rows, max_problems):
+    problems = collections.Counter()
+    examples = []
+
+    def on_error(line, reason):
+        problems[reason] += 1
+        if len(examples) < max_problems:
+            examples.append((line, reason))
+
+    reader = GestureCsvReader(path, chunk_rows=chunk_rows, on_error=on_error)
+    duplicates = NearDuplicateFilter(resolution, grids)
+    before = collections.Counter()
+    after = collections.Counter()
+    dropped = 0
+
+    # Written to a temporary file and moved into place at the end, so out
+    # may be the input itself
+    temporary = out + '.tmp'
+    with open(temporary, 'w', newline='') as f:
+        writer = csv.writer(f)
+        header_written = False
+        for labels, handedness, landmarks in reader:
+            if not header_written:
+                if reader.header is not None:
+                    writer.writerow(reader.header)
+                header_written = True
+
+            reasons = range_problems(labels, landmarks, limit, allowed_labels)
+            valid = np.array([reason is None for reason in reasons], dtype=bool)
+            for line, reason in zip(reader.lines[~valid].tolist(), reasons[~valid]):
+                on_error(line, reason)
+            before.update(labels[valid].tolist())
+
+            keep = np.zeros(len(labels), dtype=bool)
+            keep[valid] = duplicates.keep(labels[valid], handedness[valid], landmarks[valid])
+            dropped += int(valid.sum() - keep.sum())
+            after.update(labels[keep].tolist())
+            for label, hand, values in zip(labels[keep], handedness[keep], landmarks[keep].tolist()):
+                writer.writerow(format_row(label, hand, values, reader.has_hand))
+        if not header_written and reader.header is not None:
+            writer.writerow(reader.header)
+    os.replace(temporary, out)
+    return before, after, dropped, problems, examples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate a gesture CSV and drop near-duplicate rows, streaming')
+    parser.add_argument('input')
+    parser.add_argument('--out', default=None, help='defaults to <input>_compact.csv')
+    parser.add_argument('--in-place', action='store_true', help='replace the input file')
+    parser.add_argument('--resolution', type=float, default=0.02,
+                        help='grid cell size for near-duplicates, in normalized units (0: exact duplicates only)')
+    parser.add_argument('--grids', type=int, default=4,
+                        help='randomly offset grids; a row matching a kept row in any of them is dropped')
+    parser.add_argument('--limit', type=float, default=1.0, help='largest allowed absolute landmark value')
+    parser.add_argument('--labels', type=int, nargs='+', default=None, help='allowed labels (default: any)')
+    parser.add_argument('--chunk-rows', type=int, default=4096)
+    parser.add_argument('--show-problems', type=int, default=10, help='rejected rows to list')
+    args = parser.parse_args(argv)
+
+    out = args.input if args.in_place else args.out or os.path.splitext(args.input)[0] + '_compact.csv'
+    start = time.perf_counter()
+    before, after, dropped, problems, examples = compact(args.input, out, args.resolution, args.grids, args.limit,
+                                                         args.labels, args.chunk_rows, args.show_problems)
+    elapsed = time.perf_counter() - start
+
+    print(f'{args.input} -> {out} in {elapsed * 1000:.0f} ms')
+    if problems:
+        print(f'rejected {sum(problems.values())} rows:')
+        for reason, count in problems.most_common():
+            print(f'  {count:6d}  {reason}')
+        for line, reason in examples:
+            print(f'    line {line}: {reason}')
+    grids = f', {args.grids} grids' if args.resolution else ''
+    print(f'dropped {dropped} near-duplicates (resolution {args.resolution}{grids})')
+    print(f'{"label":>6} {"before":>8} {"after":>8} {"kept":>7}')
+    for label in sorted(before):
+        print(f'{label:>6} {before[label]:8d} {after[label]:8d} {after[label] / before[label]:7.1%}')
+    total_before, total_after = sum(before.values()), sum(after.values())
+    if total_before:
+        print(f'{"total":>6} {total_before:8d} {total_after:8d} {total_after / total_before:7.1%}')
+
+
+if __name__ == '__main__':
+    main()
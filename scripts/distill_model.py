@@ -0,0 +1,104 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+import warnings
+import joblib
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CompiledForest import compile_forest
+from src.MediPipeHandsModule.DistilledModel import distill
+from src.MediPipeHandsModule.GestureDataset import load_features
+from src.MediPipeHandsModule.InferenceTiming import latencies_us
+from src.MediPipeHandsModule.LandmarkFeatures import FEATURE_NAMES
+from src.MediPipeHandsModule.ModelArtifact import export_mlp, load_model
+
+# Loads the artifact the way the game does and lists the heavy libraries it pulled in
+IMPORT_CHECK = """
+import sys
+sys.path.append({root!r})
+from src.MediPipeHandsModule.GestureBackends import create_evaluator
+evaluator = create_evaluator('mlp', {path!r})
+evaluator.evaluate_batch([[1.0] + [0.0] * (evaluator.n_features - 1)])
+print(' '.join(name for name in ('sklearn', 'torch') if name in sys.modules) or 'none')
+"""
+
+
+def transfer_set(X, copies, noise, rng):
+    """
+    The training rows plus jittered copies for the teacher to label, so
+    the student also learns the teacher's behaviour between the samples.
+    """
+    jittered = np.repeat(X, copies, axis=0)
+    jittered[:, 1:] += rng.normal(0.0, noise, size=jittered[:, 1:].shape)
+    return np.concatenate((X, jittered))
+
+
+def single_sample_us(model, X):
+    return np.percentile(latencies_us(model.predict_proba, X), 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distil a gesture forest into a NumPy-only MLP artifact')
+    parser.add_argument('--teacher', default=os.path.join(project_root, 'models', 'gesture_model.pkl'))
+    parser.add_argument('--data', default=os.path.join(project_root, 'data', 'retro', 'gestures.csv'))
+    parser.add_argument('--test', default=os.path.join(project_root, 'data', 'retro', 'gestures_blind.csv'))
+    parser.add_argument('--out', default=os.path.join(project_root, 'models', 'gesture_model_mlp.gmodel'))
+    parser.add_argument('--hidden', type=int, nargs='*', default=[64],
+                        help='hidden layer sizes; none gives a linear softmax model')
+    parser.add_argument('--epochs', type=int, default=3000)
+    parser.add_argument('--copies', type=int, default=4, help='jittered copies of each row in the transfer set')
+    parser.add_argument('--noise', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    teacher = joblib.load(args.teacher)
+    X, _ = load_features(args.data)
+    X_test, y_test = load_features(args.test)
+    if teacher.n_features_in_ != X.shape[1]:
+        print(f'{args.teacher} expects {teacher.n_features_in_} features, the data has {X.shape[1]}')
+        return
+
+    rng = np.random.default_rng(args.seed)
+    transfer = transfer_set(X, args.copies, args.noise, rng)
+    start = time.perf_counter()
+    student = distill(transfer, teacher.predict_proba(transfer), teacher.classes_,
+                      hidden=tuple(args.hidden), epochs=args.epochs, seed=args.seed)
+    train_s = time.perf_counter() - start
+
+    teacher_accuracy = float(np.mean(teacher.predict(X_test) == y_test))
+    student_accuracy = float(np.mean(student.predict(X_test) == y_test))
+    agreement = float(np.mean(student.predict(X_test) == teacher.predict(X_test)))
+    export_mlp(student, args.out, model_path=args.teacher, data_path=args.data, feature_schema=FEATURE_NAMES,
+               metadata={'teacher': os.path.basename(args.teacher), 'hidden': list(args.hidden),
+                         'test_accuracy': student_accuracy, 'teacher_test_accuracy': teacher_accuracy})
+
+    student = load_model(args.out)
+    compiled = compile_forest(teacher) if hasattr(teacher, 'estimators_') else None
+    teacher_us = single_sample_us(teacher, X_test)
+    compiled_us = single_sample_us(compiled, X_test) if compiled is not None else float('nan')
+    student_us = single_sample_us(student, X_test)
+    imports = subprocess.run([sys.executable, '-c', IMPORT_CHECK.format(root=project_root, path=args.out)],
+                             capture_output=True, text=True).stdout.strip()
+
+    print(f'trained {args.hidden or "linear"} on {len(transfer)} teacher-labelled rows in {train_s:.1f} s')
+    print(f'wrote {args.out}')
+    print(f'size:     teacher {os.path.getsize(args.teacher) / 1024:.0f} KiB, '
+          f'student {os.path.getsize(args.out) / 1024:.1f} KiB')
+    print(f'accuracy on {os.path.basename(args.test)}: teacher {teacher_accuracy:.3f}, '
+          f'student {student_accuracy:.3f} (delta {student_accuracy - teacher_accuracy:+.3f}), '
+          f'agreement {agreement:.3f}')
+    print(f'single-sample p50: sklearn {teacher_us:.1f} us, compiled forest {compiled_us:.1f} us, '
+          f'student {student_us:.1f} us ({teacher_us / student_us:.0f}x / {compiled_us / student_us:.1f}x)')
+    print(f'heavy imports when loading the student: {imports}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import cv2
 import time 
 import os
@@ -16,74 +17,54 @@ data_path = os.path.join(project_root, 'data')
 
 if src_path not in sys.path:
     sys.path.append(src_path)
-
-model = joblib.load('../models/gesture_model.pkl')
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 try:
-    from MediPipeHandsModule.HandTrackingModule import hand_detector
+    from src.MediPipeHandsModule.HandTrackingModule import hand_detector, parse_size
+    from src.MediPipeHandsModule.FrameSource import open_frame_source
+    from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
+    from src.MediPipeHandsModule.LandmarkFeatures import features_from_detector
 except ImportError as e:
     print(f'error importing HandTrackingModule: {e}')
 
-def normalize_landmarks(lm_list, bbox, handedness):
-    normalized_landmarks = []
-    if len(lm_list) != 0 and bbox:
-        wrist = lm_list[0]  # Wrist is the first landmark
-        bbox_width = bbox[2]
-        bbox_height = bbox[3]
-        for joint in lm_list:
-            try:
-                # Get relative position to the wrist and scale by bbox dimensions
-                normalized_x = (joint[1] - wrist[1]) / bbox_width
-                normalized_y = (joint[2] - wrist[2]) / bbox_height
-                normalized_landmarks.append((normalized_x, normalized_y))
-            except (TypeError, IndexError, ZeroDivisionError) as e:
-                print(f"Error processing joint: {joint}, error: {e}")
-    return normalized_landmarks
-    
-
-def predict_gesture(features, model):
-    X_new = np.array(features).reshape(1, -1)
-    label = model.predict(X_new)[0]
-    return label
 
 def main():
-    cap = cv2.VideoCapture(0)
-    detector = hand_detector()
+    parser = argparse.ArgumentParser(description='Fullscreen live gesture evaluation')
+    parser.add_argument('--inference-size', type=parse_size, default=None, metavar='WxH',
+                        help='downscale frames to this size for hand detection, e.g. 320x240')
+    parser.add_argument('--source', default='0',
+                        help='camera index, video file or recorded .frames file')
+    args = parser.parse_args()
+
+    cap = open_frame_source(args.source)
+    evaluator = GestureEvaluator('../models/gesture_model.gmodel')
+    detector = hand_detector(inference_size=args.inference_size)
     pTime = 0
 
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
     cv2.namedWindow('hand capture', cv2.WINDOW_NORMAL)
     cv2.setWindowProperty('hand capture', cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
     # main loop
     while True:
         success, img = cap.read()
+        if not success and not args.source.isdigit():
+            # End of a video or recorded file
+            break
 
         if success:
-            img = cv2.resize(img, (width, height))
             img = cv2.flip(img, 1)
             img = detector.find_hands(img)
             handedness = detector.get_handedness()
 
             if handedness:
-                for i, hand in enumerate(handedness):
+                # Features for every hand in one pass, classified with one model call
+                hand_numbers, features = features_from_detector(detector)
+                labels, _ = evaluator.evaluate_batch(features)
+                for i, label in zip(hand_numbers.tolist(), labels):
                     lm_list, bbox, mid = detector.get_bbox_location(img, hand_no=i)
-                    if len(lm_list) != 0 and bbox:
-                        normalized_landmarks = normalize_landmarks(lm_list, bbox, hand)
-                        if normalized_landmarks:
-                            landmark_features = [item for sublist in normalized_landmarks for item in sublist]
-                            
-                            # Encode handedness: left=0, right=1
-                            hand_encoded = 0 if hand.lower() == 'left' else 1
-                            
-                            features = [hand_encoded] + landmark_features
-
-                            if len(features) == 43: # 1 for hand + 42 for landmarks
-                                label = predict_gesture(features, model)
-                                print(f"Predicted {hand} Label: {label}")
-                                img = cv2.putText(img, str(label), (bbox[0] + bbox[2] + 10, bbox[1] + 20),cv2.FONT_HERSHEY_SIMPLEX, 1, (255,0,255), 2, cv2.LINE_AA)
+                    print(f"Predicted {handedness[i]} Label: {label}")
+                    img = cv2.putText(img, str(label), (bbox[0] + bbox[2] + 10, bbox[1] + 20),cv2.FONT_HERSHEY_SIMPLEX, 1, (255,0,255), 2, cv2.LINE_AA)
 
             cv2.imshow('hand capture', img)
             key = cv2.waitKey(1) & 0xFF
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+import joblib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.CNNModel import CNN
+from src.MediPipeHandsModule.GestureDataset import parse_gesture_csv
+from src.MediPipeHandsModule.LandmarkFeatures import FEATURE_NAMES
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX, ModelArtifact, export_cnn, export_forest, export_knn, load_model
+
+# train_cnn.py pickled the model from its own __main__
+sys.modules['__main__'].CNN = CNN
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a pickled gesture model to a memory-mappable .gmodel artifact')
+    parser.add_argument('model', help='joblib-pickled random forest, k-nearest-neighbours model or CNN')
+    parser.add_argument('--out', default=None, help='artifact path (defaults to the model path with .gmodel)')
+    parser.add_argument('--data', default=None, help='training data file to record the hash of')
+    parser.add_argument('--labels', type=int, nargs='+', default=None,
+                        help='gesture label of each CNN output; defaults to the sorted labels in --data, '
+                             'as the training LabelEncoder assigned them')
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.model)[0] + ARTIFACT_SUFFIX
+    start = time.perf_counter()
+    model = joblib.load(args.model)
+    pickle_ms = (time.perf_counter() - start) * 1000
+
+    if isinstance(model, CNN):
+        labels = args.labels
+        if labels is None and args.data:
+            labels = sorted(set(parse_gesture_csv(args.data)[0].tolist()))
+        if labels is None or len(labels) != model.fc2.out_features:
+            print(f'the CNN has {model.fc2.out_features} outputs; give one gesture label each with --labels or --data')
+            return
+        export_cnn(model, out, model_path=args.model, data_path=args.data, feature_schema=FEATURE_NAMES,
+                   labels=labels)
+    elif hasattr(model, 'estimators_'):
+        schema = None if hasattr(model, 'feature_names_in_') or model.n_features_in_ != len(FEATURE_NAMES) else FEATURE_NAMES
+        export_forest(model, out, model_path=args.model, data_path=args.data, feature_schema=schema)
+    elif hasattr(model, '_fit_X'):
+        schema = None if hasattr(model, 'feature_names_in_') or model.n_features_in_ != len(FEATURE_NAMES) else FEATURE_NAMES
+        export_knn(model, out, model_path=args.model, data_path=args.data, feature_schema=schema)
+    else:
+        print(f'cannot export {type(model).__name__}')
+        return
+
+    start = time.perf_counter()
+    load_model(out)
+    artifact_ms = (time.perf_counter() - start) * 1000
+    artifact = ModelArtifact(out)
+    print(f'wrote {out} ({artifact.kind}, {os.path.getsize(out) / 1024:.0f} KiB, labels {artifact.metadata["labels"]})')
+    print(f'load time: pickle {pickle_ms:.1f} ms, artifact {artifact_ms:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
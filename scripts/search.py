@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from train import TRAINERS, expand, save
+from src.MediPipeHandsModule.GestureDataset import DEFAULT_CACHE_DIR, load_datasets
+from src.MediPipeHandsModule.InferenceTiming import latencies_us
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX
+
+# Hyperparameters tried for each model type
+GRID = {
+    'forest': [dict(n_estimators=n, max_depth=d) for n in (10, 25, 50, 100) for d in (4, 8, None)],
+    'knn': [dict(n_neighbors=k) for k in (1, 3, 5, 9, 15)],
+    'mlp': [dict(hidden=h) for h in ((), (16,), (64,))],
+    'cnn': [dict(width=w) for w in (4, 8, 16)],
+}
+
+# Training data, set once per worker process by _init_worker
+_X = None
+_y = None
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+    warnings.simplefilter('ignore')
+    # One thread per worker; the pool supplies the parallelism
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(1)
+
+
+def candidate_name(kind, params):
+    parts = [kind]
+    for key, value in params.items():
+        if isinstance(value, tuple):
+            value = 'x'.join(map(str, value)) or 'linear'
+        parts.append(f'{key}{value}')
+    return '-'.join(parts)
+
+
+def fit_candidate(kind, params, folds, seed, epochs):
+    """
+    Cross-validates one candidate on the worker's data, then fits it on
+    all of it. Returns (kind, params, fold accuracies, fitted model,
+    seconds spent).
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    if kind == 'cnn':
+        import torch
+        torch.set_num_threads(1)
+        params = dict(params, epochs=epochs, verbose=False)
+    start = time.perf_counter()
+    scores = []
+    for train, test in StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(_X, _y):
+        model = TRAINERS[kind](_X[train], _y[train], seed=seed, **params)
+        scores.append(float(np.mean(model.predict(_X[test]) == _y[test])))
+    model = TRAINERS[kind](_X, _y, seed=seed, **params)
+    params.pop('verbose', None)
+    return kind, params, scores, model, time.perf_counter() - start
+
+
+def runtime_model(model):
+    """
+    The form the game runs: forests and KNN compiled (see CompiledForest
+    and CompiledKNN), everything else as trained.
+    """
+    if hasattr(model, 'estimators_'):
+        from src.MediPipeHandsModule.CompiledForest import compile_forest
+        return compile_forest(model)
+    if hasattr(model, '_fit_X'):
+        from src.MediPipeHandsModule.CompiledKNN import compile_knn
+        return compile_knn(model)
+    return model
+
+
+def single_sample_us(model, X):
+    times = latencies_us(model.predict_proba, X)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 99))
+
+
+def pareto_front(results):
+    """
+    The candidates no other candidate beats on both p50 latency and mean
+    accuracy, fastest first.
+    """
+    front = []
+    best = -1.0
+    for result in sorted(results, key=lambda r: (r['p50_us'], -r['accuracy'])):
+        if result['accuracy'] > best:
+            front.append(result)
+            best = result['accuracy']
+    return front
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-validated search over gesture models, '
+                                                 'reporting the accuracy / single-sample latency Pareto front')
+    parser.add_argument('--data', nargs='+', default=[os.path.join(project_root, 'data', 'retro', 'gestures.csv')])
+    parser.add_argument('--models', nargs='+', choices=list(GRID), default=list(GRID))
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--epochs', type=int, default=20, help='CNN training epochs')
+    parser.add_argument('--samples', type=int, default=200, help='samples timed per candidate')
+    parser.add_argument('--out-dir', default=os.path.join(project_root, 'models', 'search'))
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    paths = expand(args.data)
+    dataset, _ = load_datasets(paths, args.cache_dir)
+    X, y = dataset.features, np.asarray(dataset.labels)
+    candidates = [(kind, params) for kind in args.models for params in GRID[kind]]
+    if 'cnn' in args.models and X.shape[1] != 43:
+        candidates = [(kind, params) for kind, params in candidates if kind != 'cnn']
+        print('skipping the CNN: it needs the hand column')
+    print(f'{len(candidates)} candidates, {args.folds}-fold CV on {len(y)} rows, {args.jobs} workers')
+
+    fitted = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(X, y)) as pool:
+        futures = [pool.submit(fit_candidate, kind, params, args.folds, args.seed, args.epochs)
+                   for kind, params in candidates]
+        for future in as_completed(futures):
+            kind, params, scores, model, seconds = future.result()
+            fitted.append((kind, params, scores, model))
+            print(f'  {candidate_name(kind, params):>36}  {np.mean(scores):.3f}  ({seconds:.1f} s)')
+    print(f'search took {time.perf_counter() - start:.1f} s')
+
+    # Timed one at a time in this process, so workers do not skew the latencies
+    warnings.simplefilter('ignore')
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(1)
+    timing_rows = X[np.random.default_rng(args.seed).permutation(len(X))[:args.samples]]
+    results = []
+    for kind, params, scores, model in fitted:
+        p50, p99 = single_sample_us(runtime_model(model), timing_rows)
+        results.append({
+            'name': candidate_name(kind, params),
+            'kind': kind,
+            'params': {key: list(value) if isinstance(value, tuple) else value for key, value in params.items()},
+            'accuracy': float(np.mean(scores)),
+            'accuracy_std': float(np.std(scores)),
+            'p50_us': p50,
+            'p99_us': p99,
+            'model': model,
+        })
+
+    front = pareto_front(results)
+    front_names = {result['name'] for result in front}
+    os.makedirs(args.out_dir, exist_ok=True)
+    for result in front:
+        result['path'] = os.path.join(args.out_dir, result['name'] + ARTIFACT_SUFFIX)
+        save(result['model'], result['path'], result['kind'], paths)
+
+    print(f'\n{"candidate":>36} {"accuracy":>9} {"std":>6} {"p50 us":>9} {"p99 us":>9}')
+    for result in sorted(results, key=lambda r: r['p50_us']):
+        marker = '*' if result['name'] in front_names else ' '
+        print(f'{marker}{result["name"]:>35} {result["accuracy"]:9.3f} {result["accuracy_std"]:6.3f} '
+              f'{result["p50_us"]:9.1f} {result["p99_us"]:9.1f}')
+    print(f'\n* Pareto-optimal; {len(front)} written to {args.out_dir}')
+
+    report = {
+        'data': paths,
+        'folds': args.folds,
+        'candidates': [{key: value for key, value in result.items() if key != 'model'} for result in results],
+        'pareto': [result['name'] for result in front],
+    }
+    with open(os.path.join(args.out_dir, 'search.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,238 @@
-import pandas as pd
-import numpy as np 
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+import argparse
+import glob
+import os
+import sys
+import time
 import joblib
-from pathlib import Path 
-
-script_path = Path(__file__).resolve()
-root_dir = script_path.parent.parent
-data_path = root_dir/'data'/'retro'/'gestures.csv'
-model_path = root_dir/'models'/'rf_model.pkl'
-df = pd.read_csv(data_path, header=None)
-if len(df) < 2:
-    print("Not enough data to train the model. Please capture more gestures.")
-else:
-    y = df.iloc[1:, 0]
-
-    # Encode handedness (column 1)
-    handedness = df.iloc[1:, 1].astype('category').cat.codes
-
-    # Landmark data starts from column 2
-    landmarks = df.iloc[1:, 2:]
-
-    # Combine handedness and landmarks into features
-    X = pd.concat([handedness, landmarks], axis=1)
-
-    X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-            )
-
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
-
-    accuracy = model.score(X_test, y_test)
-    print(f'Accuracy for unified model: {accuracy:.2f}')
-    joblib.dump(model, model_path)
-    print('Saved unified gesture model.')
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.join(current_dir, '..')
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.MediPipeHandsModule.GestureAugment import GestureAugmenter
+from src.MediPipeHandsModule.GestureDataset import DEFAULT_CACHE_DIR, load_datasets
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX
+
+
+# Every trainer takes batches=None: a callable returning one epoch of
+# (features, labels) batches, e.g. from GestureAugmenter.batches, to train on
+# in place of X and y. The MLP and CNN stream them; forests and KNN need
+# all their rows at once, so the batches are collected first.
+
+def _collect(batches):
+    rows, labels = zip(*batches())
+    return np.concatenate(rows), np.concatenate(labels)
+
+
+def train_forest(X, y, seed=42, n_estimators=100, max_depth=None, batches=None):
+    from sklearn.ensemble import RandomForestClassifier
+    if batches is not None:
+        X, y = _collect(batches)
+    return RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, random_state=seed).fit(X, y)
+
+
+def train_knn(X, y, seed=42, n_neighbors=5, batches=None):
+    from sklearn.neighbors import KNeighborsClassifier
+    if batches is not None:
+        X, y = _collect(batches)
+    return KNeighborsClassifier(n_neighbors=n_neighbors).fit(X, y)
+
+
+def train_mlp(X, y, seed=42, hidden=(32,), epochs=2000, batches=None):
+    from src.MediPipeHandsModule.DistilledModel import distill
+    classes, codes = np.unique(y, return_inverse=True)
+    one_hot = np.eye(len(classes))
+    streamed = None
+    if batches is not None:
+        streamed = lambda: ((rows, one_hot[np.searchsorted(classes, labels)]) for rows, labels in batches())
+    # One-hot targets: distillation from a teacher that is always certain
+    return distill(X, one_hot[codes], classes, hidden=tuple(hidden), epochs=epochs, seed=seed, batches=streamed)
+
+
+class CNNClassifier:
+    """
+    Gives the CNN training loop the fit/predict shape of the other model
+    types. The saved model is the bare CNN, as before; its outputs are
+    indices into classes_.
+    """
+
+    def __init__(self, epochs=20, width=16, seed=42, verbose=True):
+        self.epochs = epochs
+        self.width = width
+        self.seed = seed
+        self.verbose = verbose
+
+    @staticmethod
+    def _tensors(X):
+        import torch
+        X = np.asarray(X, dtype=np.float32)
+        return torch.from_numpy(X[:, 1:].reshape(-1, 1, 6, 7).copy()), torch.from_numpy(X[:, :1].copy())
+
+    def fit(self, X, y, batches=None):
+        import torch
+        from torch import nn
+        from torch.utils.data import DataLoader, TensorDataset
+        from src.MediPipeHandsModule.CNNModel import CNN
+
+        torch.manual_seed(self.seed)
+        self.classes_, codes = np.unique(y, return_inverse=True)
+        if batches is None:
+            landmarks, handedness = self._tensors(X)
+            loader = DataLoader(TensorDataset(landmarks, handedness, torch.from_numpy(codes.astype(np.int64))),
+                                batch_size=32, shuffle=True)
+            epoch_batches = lambda: loader
+        else:
+            epoch_batches = lambda: ((*self._tensors(rows), torch.from_numpy(np.searchsorted(self.classes_, labels)))
+                                     for rows, labels in batches())
+
+        self.model = CNN(num_classes=len(self.classes_), width=self.width)
+        criterion = nn.CrossEntropyLoss()
+        optimizer = torch.optim.Adam(self.model.parameters(), lr=0.001)
+        for epoch in range(self.epochs):
+            for landmarks, handedness, labels in epoch_batches():
+                optimizer.zero_grad()
+                loss = criterion(self.model(landmarks, handedness), labels)
+                loss.backward()
+                optimizer.step()
+            if self.verbose:
+                print(f'Epoch [{epoch+1}/{self.epochs}], Loss: {loss.item():.4f}')
+        self.model.eval()
+        return self
+
+    def predict_proba(self, X):
+        import torch
+        with torch.inference_mode():
+            return torch.softmax(self.model(*self._tensors(X)), dim=1).numpy()
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def train_cnn(X, y, seed=42, epochs=20, width=16, verbose=True, batches=None):
+    if X.shape[1] != 43:
+        raise ValueError('the CNN needs the hand column (43 features)')
+    return CNNClassifier(epochs=epochs, width=width, seed=seed, verbose=verbose).fit(X, y, batches)
+
+
+TRAINERS = {
+    'forest': train_forest,
+    'knn': train_knn,
+    'mlp': train_mlp,
+    'cnn': train_cnn,
+}
+
+# Where each model type is saved unless --out says otherwise
+DEFAULT_OUT = {
+    'forest': 'rf_model.pkl',
+    'knn': 'gesture_model_knn.pkl',
+    'mlp': 'gesture_model_mlp.gmodel',
+    'cnn': 'gesture_model_cnn.pkl',
+}
+
+
+def save(model, path, kind, data_paths):
+    saved = model.model if isinstance(model, CNNClassifier) else model
+    if not path.endswith(ARTIFACT_SUFFIX):
+        joblib.dump(saved, path)
+        return
+
+    from src.MediPipeHandsModule import ModelArtifact
+    from src.MediPipeHandsModule.LandmarkFeatures import FEATURE_NAMES
+    schema = FEATURE_NAMES if isinstance(model, CNNClassifier) or model.n_features_in_ == len(FEATURE_NAMES) else None
+    data_path = data_paths[0] if len(data_paths) == 1 else None
+    if kind == 'forest':
+        ModelArtifact.export_forest(saved, path, data_path=data_path, feature_schema=schema)
+    elif kind == 'knn':
+        ModelArtifact.export_knn(saved, path, data_path=data_path, feature_schema=schema)
+    elif kind == 'mlp':
+        ModelArtifact.export_mlp(saved, path, data_path=data_path, feature_schema=schema)
+    else:
+        ModelArtifact.export_cnn(saved, path, data_path=data_path, feature_schema=schema,
+                                 labels=model.classes_.tolist())
+
+
+def expand(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train any gesture model type from cached capture data')
+    parser.add_argument('--model', choices=list(TRAINERS), default='forest')
+    parser.add_argument('--data', nargs='+', default=[os.path.join(project_root, 'data', 'retro', 'gestures.csv')],
+                        help='capture CSVs or globs, e.g. "data/**/*.csv"')
+    parser.add_argument('--out', default=None,
+                        help='output model (.pkl, or .gmodel for an artifact); defaults per model type under models/')
+    parser.add_argument('--test', nargs='+', default=None,
+                        help='held-out CSVs to score on instead of a random split')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--epochs', type=int, default=20,
+                        help='CNN training epochs, and MLP epochs when augmenting')
+    parser.add_argument('--augment', type=int, default=0,
+                        help='train on this many augmented rows per epoch, generated on the fly (0: no augmentation)')
+    parser.add_argument('--batch-size', type=int, default=256, help='rows per augmented batch')
+    parser.add_argument('--mirror', type=float, default=0.5, help='probability of mirroring a row')
+    parser.add_argument('--flip-handedness', action='store_true', help='also flip the hand code of mirrored rows')
+    parser.add_argument('--rotation', type=float, default=10.0, help='largest rotation, degrees')
+    parser.add_argument('--scale', type=float, default=0.1, help='largest relative size change')
+    parser.add_argument('--aspect', type=float, default=0.1, help='largest relative aspect change')
+    parser.add_argument('--noise', type=float, default=0.01, help='landmark noise standard deviation')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help='parse the CSVs without reading or writing the cache')
+    parser.add_argument('--convert-only', action='store_true',
+                        help='only convert the data into the cache, e.g. --data "data/**/*.csv" --convert-only')
+    args = parser.parse_args(argv)
+
+    paths = expand(args.data)
+    start = time.perf_counter()
+    if args.convert_only:
+        for path in paths:
+            dataset, cached = load_datasets([path], args.cache_dir, not args.no_cache)
+            print(f'{path}: {len(dataset)} rows{" (cached)" if cached else ""}')
+        print(f'converted {len(paths)} files in {(time.perf_counter() - start) * 1000:.1f} ms')
+        return
+
+    dataset, cached = load_datasets(paths, args.cache_dir, not args.no_cache)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f'loaded {len(dataset)} rows from {len(paths)} files ({cached} cached) in {load_ms:.1f} ms')
+    if len(dataset) < 2:
+        print("Not enough data to train the model. Please capture more gestures.")
+        return
+
+    X, y = dataset.features, np.asarray(dataset.labels)
+    if args.test:
+        test, _ = load_datasets(expand(args.test), args.cache_dir, not args.no_cache)
+        X_train, y_train, X_test, y_test = X, y, test.features, np.asarray(test.labels)
+    else:
+        from sklearn.model_selection import train_test_split
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.seed)
+
+    options = {'epochs': args.epochs} if args.model == 'cnn' else {}
+    if args.augment:
+        # Only the training split is augmented; the test rows stay as captured
+        augmenter = GestureAugmenter(mirror=args.mirror, rotation=args.rotation, scale=args.scale,
+                                     aspect=args.aspect, noise=args.noise,
+                                     flip_handedness=args.flip_handedness, seed=args.seed)
+        options['batches'] = lambda: augmenter.batches(X_train, y_train, args.augment, args.batch_size)
+        if args.model == 'mlp':
+            options['epochs'] = args.epochs
+
+    start = time.perf_counter()
+    model = TRAINERS[args.model](X_train, y_train, seed=args.seed, **options)
+    train_s = time.perf_counter() - start
+    accuracy = np.mean(model.predict(X_test) == y_test)
+    print(f'Accuracy for {args.model} model: {accuracy:.3f} ({len(y_test)} test rows, trained in {train_s:.1f} s)')
+
+    out = args.out or os.path.join(project_root, 'models', DEFAULT_OUT[args.model])
+    save(model, out, args.model, paths)
+    print(f'Saved {args.model} gesture model to {out}')
+
+
+if __name__ == '__main__':
+    main()
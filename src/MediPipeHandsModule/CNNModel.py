@@ -2,17 +2,19 @@ import torch
 from torch import nn
 
 class CNN(nn.Module):
-    def __init__(self, num_classes):
+    def __init__(self, num_classes, width=16):
+        # width is conv1's channel count; conv2 has twice and fc1 four times
+        # as many. The default gives the original 16/32/64 network.
         super(CNN, self).__init__()
-        self.conv1 = nn.Conv2d(1, 16, kernel_size=3, padding=1)
+        self.conv1 = nn.Conv2d(1, width, kernel_size=3, padding=1)
         self.relu1 = nn.ReLU()
         self.pool1 = nn.MaxPool2d(2)
-        self.conv2 = nn.Conv2d(16, 32, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv2d(width, 2 * width, kernel_size=3, padding=1)
         self.relu2 = nn.ReLU()
         self.pool2 = nn.MaxPool2d(2)
-        self.fc1 = nn.Linear(32 * 1 * 1 + 1, 64) # Add 1 for handedness
+        self.fc1 = nn.Linear(2 * width * 1 * 1 + 1, 4 * width) # Add 1 for handedness
         self.relu3 = nn.ReLU()
-        self.fc2 = nn.Linear(64, num_classes)
+        self.fc2 = nn.Linear(4 * width, num_classes)
 
     def forward(self, landmarks, handedness):
         x = self.pool1(self.relu1(self.conv1(landmarks)))
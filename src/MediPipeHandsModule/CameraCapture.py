@@ -0,0 +1,124 @@
+import threading
+import time
+import cv2
+from src.MediPipeHandsModule.FrameSource import open_frame_source
+
+
+class CameraCapture:
+    """
+    Owns a frame source (see FrameSource) and reads it on a background thread into a
+    single latest-frame slot, so the game loop never blocks on the camera.
+
+    Every stored frame gets a sequence number and a capture timestamp
+    (time.monotonic()). Callers remember the last sequence number they
+    consumed and ask for anything newer with read_latest().
+    """
+
+    def __init__(self, source=0, drain_max_frames=10):
+        if isinstance(source, (int, str)):
+            self.cap = open_frame_source(source)
+        else:
+            self.cap = source
+        self.drain_max_frames = drain_max_frames
+
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._seq = 0
+        self._timestamp = 0.0
+        self._min_seq = 0
+
+        self._running = False
+        self._active = threading.Event()
+        self._drain_requested = False
+        self._thread = None
+
+    def start(self, paused=False):
+        if self._thread is not None:
+            return self
+        self._running = True
+        if not paused:
+            self._active.set()
+        self._thread = threading.Thread(target=self._reader, name="CameraCapture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _reader(self):
+        while self._running:
+            if not self._active.wait(timeout=0.1):
+                continue
+
+            if self._drain_requested:
+                self._drain_requested = False
+                self._drain_buffer()
+
+            success, frame = self.cap.read()
+            timestamp = time.monotonic()
+            if not success:
+                time.sleep(self.frame_interval / 2)
+                continue
+
+            with self._lock:
+                self._seq += 1
+                self._frame = frame
+                self._timestamp = timestamp
+
+    def _drain_buffer(self):
+        # Frames queued by the driver while nobody was reading come back from
+        # grab() immediately; a fresh frame takes about one frame interval.
+        for _ in range(self.drain_max_frames):
+            start = time.monotonic()
+            if not self.cap.grab():
+                break
+            if time.monotonic() - start > self.frame_interval / 2:
+                break
+
+    def read_latest(self, last_seq=0):
+        """
+        Returns (seq, timestamp, frame) for the newest frame if it is newer
+        than last_seq, otherwise None. Never blocks on the camera.
+        """
+        with self._lock:
+            if self._frame is None or self._seq <= max(last_seq, self._min_seq):
+                return None
+            return self._seq, self._timestamp, self._frame
+
+    def read(self):
+        """
+        cv2.VideoCapture-compatible read of the newest frame. Returns
+        (False, None) until the first frame has arrived.
+        """
+        latest = self.read_latest()
+        if latest is None:
+            return False, None
+        return True, latest[2]
+
+    def drain(self):
+        """
+        Forgets the frame currently in the slot and flushes frames the
+        driver buffered while the reader was paused.
+        """
+        with self._lock:
+            self._min_seq = self._seq
+        self._drain_requested = True
+
+    def pause(self):
+        self._active.clear()
+
+    def resume(self, drain=True):
+        if drain:
+            self.drain()
+        self._active.set()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def release(self):
+        self._running = False
+        self._active.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class CompiledForest:
+    """
+    A fitted sklearn RandomForestClassifier flattened into contiguous NumPy
+    arrays, with every tree walked at once by a vectorized traversal.
+
+    All trees share one node table. Leaves point to themselves, so a fixed
+    number of steps (the deepest tree's depth) moves every tree from its
+    root to its leaf with no per-tree Python loop. Inputs are compared as
+    float32, and leaf probabilities are summed in estimator order, as
+    sklearn does, so predictions match model.predict exactly.
+
+    Exposes classes_, predict and predict_proba, so it drops in wherever
+    the sklearn model was used.
+    """
+
+    def __init__(self, feature, threshold, children, leaf_proba, roots, depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        self.children = children
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    def apply(self, X):
+        """
+        Returns the (N, n_trees) leaf node reached by each sample in each tree.
+        """
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.depth):
+            go_right = X[rows, self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        leaves = self.apply(X)
+        # Reducing over the tree axis adds one tree at a time, like sklearn
+        proba = self.leaf_proba[leaves.T].sum(axis=0)
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def compile_forest(model):
+    """
+    Flattens a fitted RandomForestClassifier (or any ensemble of
+    single-output DecisionTreeClassifiers in model.estimators_) into a
+    CompiledForest.
+    """
+    if getattr(model, 'n_outputs_', 1) != 1:
+        raise ValueError('only single-output forests can be compiled')
+
+    features, thresholds, children, leaf_probas, roots = [], [], [], [], []
+    depth = 0
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        count = tree.node_count
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(count)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+        children.append(np.column_stack((left, right)).ravel())
+
+        # Normalised the same way DecisionTreeClassifier.predict_proba does
+        value = tree.value[:, 0, :]
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_probas.append(value / normalizer)
+
+        roots.append(offset)
+        depth = max(depth, tree.max_depth)
+        offset += count
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.intp),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        children=np.concatenate(children).astype(np.intp),
+        leaf_proba=np.ascontiguousarray(np.concatenate(leaf_probas), dtype=np.float64),
+        roots=np.array(roots, dtype=np.intp),
+        depth=depth,
+        classes=model.classes_,
+        n_features=model.n_features_in_,
+    )
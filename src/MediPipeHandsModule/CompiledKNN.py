@@ -0,0 +1,186 @@
+import numpy as np
+
+KNN_INDEXES = ('brute', 'kdtree', 'prototypes')
+
+
+class CompiledKNN:
+    """
+    A fitted sklearn KNeighborsClassifier reduced to a contiguous float32
+    matrix of training points, their squared norms and integer class codes.
+
+    index picks how neighbours are found:
+      'brute'       one BLAS matrix-vector product against every point,
+                    using |p|^2 - 2 p.x (|x|^2 is the same for every point)
+      'kdtree'      scipy's cKDTree, built on first use
+      'prototypes'  brute force over a per-class k-means summary of the
+                    training set (see prototype_knn), each prototype
+                    voting with the number of points it stands for
+
+    Exposes classes_, n_features_in_, kneighbors, predict and predict_proba,
+    so it drops in wherever the sklearn model was used. Only the euclidean
+    metric and 'uniform' or 'distance' weights are supported.
+    """
+
+    def __init__(self, points, codes, classes, n_neighbors, weights='uniform', index='brute', counts=None):
+        if index not in KNN_INDEXES:
+            raise ValueError(f'unknown knn index: {index}')
+        if weights not in ('uniform', 'distance'):
+            raise ValueError(f'unsupported knn weights: {weights}')
+        self.points = np.ascontiguousarray(points, dtype=np.float32)
+        self.sq_norms = np.einsum('ij,ij->i', self.points, self.points)
+        self.codes = np.asarray(codes, dtype=np.intp)
+        # How many training points each row stands for (1 unless prototypes)
+        self.counts = np.ones(len(self.points), dtype=np.float32) if counts is None \
+            else np.asarray(counts, dtype=np.float32)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = self.points.shape[1]
+        # Requested k, kept so k can grow back as partial_fit adds points
+        self.k = int(n_neighbors)
+        self.n_neighbors = min(self.k, len(self.points))
+        self.weights = weights
+        self.index = index
+        self._tree = None
+        # One-hot class rows, so votes are a single matrix product
+        self._one_hot = np.eye(len(self.classes_), dtype=np.float32)[self.codes]
+
+    def partial_fit(self, X, y):
+        """
+        Adds labelled rows to the index without refitting, for online
+        updates. Labels not seen before become new classes. Only the
+        'brute' and 'kdtree' indexes can grow (the tree is rebuilt on the
+        next query). Returns self.
+        """
+        if self.index == 'prototypes':
+            raise ValueError('a prototype index cannot be updated; compile a brute or kdtree index')
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        y = np.asarray(y).reshape(-1)
+        classes = np.union1d(self.classes_, y)
+        if len(classes) != len(self.classes_):
+            # Existing codes index the old class list
+            self.codes = np.searchsorted(classes, self.classes_[self.codes])
+            self.classes_ = classes
+        codes = np.searchsorted(self.classes_, y)
+
+        self.points = np.concatenate((self.points, X))
+        self.sq_norms = np.concatenate((self.sq_norms, np.einsum('ij,ij->i', X, X)))
+        self.codes = np.concatenate((self.codes, codes))
+        self.counts = np.concatenate((self.counts, np.ones(len(X), dtype=np.float32)))
+        self._one_hot = np.eye(len(self.classes_), dtype=np.float32)[self.codes]
+        self.n_neighbors = min(self.k, len(self.points))
+        self._tree = None
+        return self
+
+    def kneighbors(self, X):
+        """
+        Returns (distances, indices), both (N, n_neighbors), nearest first.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        k = self.n_neighbors
+
+        if self.index == 'kdtree':
+            if self._tree is None:
+                from scipy.spatial import cKDTree
+                self._tree = cKDTree(self.points)
+            distances, indices = self._tree.query(X, k=k)
+            return distances.reshape(len(X), k), indices.reshape(len(X), k)
+
+        partial = self.sq_norms - 2.0 * (X @ self.points.T)
+        if k < partial.shape[1]:
+            indices = np.argpartition(partial, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(partial, indices, axis=1).argsort(axis=1, kind='stable')
+            indices = np.take_along_axis(indices, order, axis=1)
+        else:
+            indices = partial.argsort(axis=1, kind='stable')
+        sq_distances = np.take_along_axis(partial, indices, axis=1) + np.einsum('ij,ij->i', X, X)[:, None]
+        return np.sqrt(np.maximum(sq_distances, 0.0)), indices
+
+    def predict_proba(self, X):
+        distances, indices = self.kneighbors(X)
+        votes = self.counts[indices]
+        if self.weights == 'distance':
+            with np.errstate(divide='ignore'):
+                inverse = 1.0 / distances
+            # As in sklearn, an exact match outvotes everything else
+            exact = np.isinf(inverse)
+            rows = exact.any(axis=1)
+            inverse[rows] = exact[rows]
+            votes = votes * inverse
+        proba = np.einsum('nk,nkc->nc', votes, self._one_hot[indices]).astype(np.float64)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _kmeans(points, k, iterations=20):
+    # Farthest-point initialisation keeps it deterministic and spread out
+    centers = [points[0]]
+    sq_distances = ((points - points[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        centers.append(points[sq_distances.argmax()])
+        sq_distances = np.minimum(sq_distances, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers, dtype=np.float64)
+
+    for _ in range(iterations):
+        assignment = ((points[:, None, :] - centers[None]) ** 2).sum(axis=2).argmin(axis=1)
+        updated = centers.copy()
+        for j in range(k):
+            members = points[assignment == j]
+            if len(members):
+                updated[j] = members.mean(axis=0)
+        if np.array_equal(updated, centers):
+            break
+        centers = updated
+    counts = np.bincount(assignment, minlength=k)
+    keep = counts > 0
+    return centers[keep], counts[keep]
+
+
+def prototype_knn(knn, per_class=16):
+    """
+    Summarises a CompiledKNN with at most per_class k-means centroids per
+    class. Query cost no longer grows with the training set, at some cost
+    in accuracy near class boundaries.
+    """
+    points, codes, counts = [], [], []
+    for code in range(len(knn.classes_)):
+        members = knn.points[knn.codes == code].astype(np.float64)
+        if not len(members):
+            continue
+        if len(members) <= per_class:
+            centers, sizes = members, np.ones(len(members))
+        else:
+            centers, sizes = _kmeans(members, per_class)
+        points.append(centers)
+        codes.append(np.full(len(centers), code))
+        counts.append(sizes)
+    return CompiledKNN(np.concatenate(points), np.concatenate(codes), knn.classes_, knn.k,
+                       weights=knn.weights, index='prototypes', counts=np.concatenate(counts))
+
+
+def compile_knn(model, index='brute', per_class=16):
+    """
+    Builds a CompiledKNN with the given index from a fitted
+    KNeighborsClassifier, or re-indexes an existing CompiledKNN (e.g. one
+    loaded from an artifact).
+    """
+    if index not in KNN_INDEXES:
+        raise ValueError(f'unknown knn index: {index}')
+    if isinstance(model, CompiledKNN):
+        knn = model
+    else:
+        if model.effective_metric_ != 'euclidean':
+            raise ValueError(f'only euclidean knn models can be compiled, not {model.effective_metric_}')
+        if getattr(model, 'outputs_2d_', False):
+            raise ValueError('only single-output knn models can be compiled')
+        knn = CompiledKNN(model._fit_X, model._y, model.classes_, model.n_neighbors, weights=model.weights)
+
+    if index == 'prototypes':
+        return prototype_knn(knn, per_class)
+    if knn.index == index:
+        return knn
+    return CompiledKNN(knn.points, knn.codes, knn.classes_, knn.k,
+                       weights=knn.weights, index=index, counts=knn.counts)
@@ -0,0 +1,117 @@
+import collections
+import time
+import cv2
+import numpy as np
+
+
+class DetectionScheduler:
+    """
+    Sits in front of a hand_detector and runs full detection at most
+    target_rate times per second, and only when a downscaled frame
+    difference against the last detected frame shows motion. On other
+    frames the cached landmarks are held, or extrapolated from the last two
+    detections, so callers still get landmarks on every frame.
+
+    Exposes the rest of the detector's API unchanged, so it can be passed
+    anywhere a hand_detector is expected.
+    """
+
+    def __init__(self, detector, target_rate=15.0, motion_threshold=3.0, motion_size=(32, 24),
+                 max_interval=1.0, max_extrapolation=0.1, extrapolate=True):
+        self.detector = detector
+        self.target_rate = target_rate
+        # Mean absolute grey-level change (0-255) that counts as motion
+        self.motion_threshold = motion_threshold
+        self.motion_size = motion_size
+        # Detect at least this often even in a static scene
+        self.max_interval = max_interval
+        self.max_extrapolation = max_extrapolation
+        self.extrapolate = extrapolate
+
+        self.reference = None
+        self.last_time = None
+        self.history = collections.deque(maxlen=2)
+        self.detection_times = collections.deque(maxlen=30)
+
+        self.frames = 0
+        self.detections = 0
+        self.skipped_rate = 0
+        self.skipped_static = 0
+        self.last_motion = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+
+    def _motion_frame(self, img):
+        small = cv2.resize(img, self.motion_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def should_detect(self, small, now):
+        if self.last_time is None or self.reference is None:
+            return True
+        elapsed = now - self.last_time
+        if elapsed < 1.0 / self.target_rate:
+            self.skipped_rate += 1
+            return False
+        self.last_motion = float(cv2.absdiff(small, self.reference).mean())
+        if self.last_motion < self.motion_threshold and elapsed < self.max_interval:
+            self.skipped_static += 1
+            return False
+        return True
+
+    def find_hands(self, img, draw=True, timestamp=None):
+        now = time.monotonic() if timestamp is None else timestamp
+        self.frames += 1
+        small = self._motion_frame(img)
+
+        if self.should_detect(small, now):
+            self.detector.find_hands(img, draw=False)
+            self.reference = small
+            self.last_time = now
+            self.detections += 1
+            self.detection_times.append(now)
+            self.history.append((now, self.detector.landmarks.copy(), self.detector.handedness_codes))
+        elif self.extrapolate:
+            self._extrapolate(now, img.shape)
+
+        if draw:
+            self.detector.draw_landmarks(img)
+        return img
+
+    def _extrapolate(self, now, shape):
+        """
+        Moves the cached landmarks along the velocity between the last two
+        detections, for at most max_extrapolation seconds. Holds them when
+        the two detections do not describe the same hands.
+        """
+        if len(self.history) < 2:
+            return
+        (prev_time, prev, prev_codes), (last_time, last, last_codes) = self.history
+        if len(prev) != len(last) or not len(last) or not np.array_equal(prev_codes, last_codes):
+            return
+        ahead = min(now - last_time, self.max_extrapolation)
+        predicted = last + (last - prev) * (ahead / (last_time - prev_time))
+        h, w = shape[:2]
+        predicted[:, :, 0] /= w
+        predicted[:, :, 1] /= h
+        self.detector.set_landmarks(predicted, shape)
+
+    @property
+    def detection_rate(self):
+        """
+        Observed detections per second over the last few detections.
+        """
+        if len(self.detection_times) < 2:
+            return 0.0
+        return (len(self.detection_times) - 1) / (self.detection_times[-1] - self.detection_times[0])
+
+    def stats(self):
+        return {
+            'target_rate': self.target_rate,
+            'detection_rate': self.detection_rate,
+            'frames': self.frames,
+            'detections': self.detections,
+            'skipped_rate': self.skipped_rate,
+            'skipped_static': self.skipped_static,
+            'last_motion': self.last_motion,
+        }
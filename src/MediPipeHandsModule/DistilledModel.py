@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class DistilledMLP:
+    """
+    A small multilayer perceptron (ReLU hidden layers, softmax output) held
+    as plain float32 weight arrays. With no hidden layers it is a softmax
+    linear model. Inference is a few NumPy matrix products, so loading and
+    running it needs neither sklearn nor torch.
+
+    Input standardisation is folded into the first layer, so raw feature
+    rows go straight in. Exposes classes_, n_features_in_, predict and
+    predict_proba, so it drops in wherever the sklearn model was used.
+    """
+
+    def __init__(self, weights, biases, classes):
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = self.weights[0].shape[0]
+
+    def logits(self, X):
+        h = np.asarray(X, dtype=np.float32)
+        if h.ndim == 1:
+            h = h.reshape(1, -1)
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            h = h @ w
+            h += b
+            np.maximum(h, 0.0, out=h)
+        return h @ self.weights[-1] + self.biases[-1]
+
+    def predict_proba(self, X):
+        z = self.logits(X).astype(np.float64)
+        z -= z.max(axis=1, keepdims=True)
+        np.exp(z, out=z)
+        z /= z.sum(axis=1, keepdims=True)
+        return z
+
+    def predict(self, X):
+        return self.classes_[self.logits(X).argmax(axis=1)]
+
+
+def _adam_step(weights, biases, moments, velocities, Z, targets, step, learning_rate, l2):
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    # Forward, keeping each layer's input for the backward pass
+    activations = [Z]
+    for w, b in zip(weights[:-1], biases[:-1]):
+        activations.append(np.maximum(activations[-1] @ w + b, 0.0))
+    logits = activations[-1] @ weights[-1] + biases[-1]
+    logits -= logits.max(axis=1, keepdims=True)
+    proba = np.exp(logits)
+    proba /= proba.sum(axis=1, keepdims=True)
+
+    delta = (proba - targets) / len(Z)
+    grad_w = [None] * len(weights)
+    grad_b = [None] * len(biases)
+    for layer in range(len(weights) - 1, -1, -1):
+        grad_w[layer] = activations[layer].T @ delta + l2 * weights[layer]
+        grad_b[layer] = delta.sum(axis=0)
+        if layer:
+            delta = (delta @ weights[layer].T) * (activations[layer] > 0.0)
+
+    for p, g, m, v in zip(weights + biases, grad_w + grad_b, moments, velocities):
+        m *= beta1
+        m += (1 - beta1) * g
+        v *= beta2
+        v += (1 - beta2) * g * g
+        p -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+
+def distill(X, soft_labels, classes, hidden=(32,), epochs=2000, learning_rate=0.01, l2=1e-4, seed=0,
+            batches=None):
+    """
+    Trains a DistilledMLP to match a teacher's class probabilities
+    soft_labels (N, num_classes) on feature rows X (N, n_features), by
+    full-batch Adam on the cross-entropy to the soft labels.
+
+    batches, when given, is called once per epoch for an iterable of
+    (rows, soft labels) minibatches (e.g. GestureAugmenter.batches) that
+    are trained on instead; X then only sets the input standardisation.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    targets = np.asarray(soft_labels, dtype=np.float64)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0.0] = 1.0
+    Z = (X - mean) / scale
+
+    rng = np.random.default_rng(seed)
+    sizes = [X.shape[1], *hidden, targets.shape[1]]
+    weights = [rng.normal(0.0, np.sqrt(2.0 / n_in), (n_in, n_out)) for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+    biases = [np.zeros(n_out) for n_out in sizes[1:]]
+    moments = [np.zeros_like(p) for p in weights + biases]
+    velocities = [np.zeros_like(p) for p in weights + biases]
+
+    def epoch():
+        if batches is None:
+            yield Z, targets
+            return
+        for rows, soft in batches():
+            yield (np.asarray(rows, dtype=np.float64) - mean) / scale, np.asarray(soft, dtype=np.float64)
+
+    step = 0
+    for _ in range(epochs):
+        for Z_batch, target_batch in epoch():
+            step += 1
+            _adam_step(weights, biases, moments, velocities, Z_batch, target_batch, step, learning_rate, l2)
+
+    # Fold (x - mean) / scale into the first layer
+    first = weights[0] / scale[:, None]
+    weights = [first] + weights[1:]
+    biases = [biases[0] - mean @ first] + biases[1:]
+    return DistilledMLP(weights, biases, classes)
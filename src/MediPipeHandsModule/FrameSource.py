@@ -0,0 +1,334 @@
+import logging
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+# Recorded-frames file: a 64-byte header followed by fixed-size records of
+# (float64 timestamp, height x width x channels uint8 frame). New frames are
+# appended, and readers memory-map the records as a structured array.
+RECORDING_SUFFIX = '.frames'
+RECORDING_MAGIC = b'HGFRAME1'
+RECORDING_HEADER = np.dtype([('magic', 'S8'), ('height', '<u4'), ('width', '<u4'),
+                             ('channels', '<u4'), ('reserved', 'u1', (44,))])
+
+
+logger = logging.getLogger(__name__)
+
+
+def record_dtype(height, width, channels=3):
+    return np.dtype([('timestamp', '<f8'), ('frame', 'u1', (height, width, channels))])
+
+
+class CameraSource:
+    """
+    Live camera. Thin wrapper over cv2.VideoCapture that also records
+    when each frame was read.
+    """
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self.timestamp = None
+
+    def read(self):
+        success, img = self.cap.read()
+        self.timestamp = time.monotonic()
+        return success, img
+
+    def grab(self):
+        return self.cap.grab()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """
+    Video file decoded with cv2.VideoCapture. Plays back as fast as it is
+    read unless realtime=True, which paces frames at the file's frame rate.
+    """
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        self.timestamp = None
+        self._start = None
+
+    def read(self):
+        success, img = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._start = None
+            success, img = self.cap.read()
+        if not success:
+            return False, None
+        self.timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if self.realtime:
+            _pace(self, self.timestamp)
+        return True, img
+
+    def grab(self):
+        return self.read()[0]
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class RecordedFrameSource:
+    """
+    Replays a recorded-frames file through a read-only memory map, so
+    frames are neither decoded nor loaded up front. Reads return frames
+    in order at full speed, or at the recorded pace with realtime=True.
+    """
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        size = os.path.getsize(path)
+        header = np.fromfile(path, dtype=RECORDING_HEADER, count=1)
+        if size < RECORDING_HEADER.itemsize or header[0]['magic'] != RECORDING_MAGIC:
+            raise ValueError(f'{path} is not a recorded-frames file')
+        header = header[0]
+        self.shape = (int(header['height']), int(header['width']), int(header['channels']))
+        dtype = record_dtype(*self.shape)
+        # A recording cut off mid-write ends in a partial record; ignore it
+        count = (size - RECORDING_HEADER.itemsize) // dtype.itemsize
+        if not count:
+            raise ValueError(f'{path} holds no complete frames')
+        self.records = np.memmap(path, dtype=dtype, mode='r', offset=RECORDING_HEADER.itemsize, shape=(count,))
+        self.timestamps = self.records['timestamp']
+        self.position = 0
+        self.timestamp = None
+        self._start = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def read(self):
+        if self.position >= len(self.records):
+            if not self.loop or not len(self.records):
+                return False, None
+            self.position = 0
+            self._start = None
+        record = self.records[self.position]
+        self.position += 1
+        self.timestamp = float(record['timestamp'])
+        if self.realtime:
+            _pace(self, self.timestamp)
+        # Copy out of the read-only map so callers can draw on the frame
+        return True, np.array(record['frame'])
+
+    def grab(self):
+        return self.read()[0]
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.shape[1]
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.shape[0]
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.records)
+        if prop_id == cv2.CAP_PROP_FPS and len(self.records) > 1:
+            return (len(self.records) - 1) / max(self.timestamps[-1] - self.timestamps[0], 1e-6)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return self.position
+        return 0
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        self.records = None
+        self.timestamps = None
+
+
+def _pace(source, timestamp):
+    # Sleeps so frames come out at the spacing of their timestamps
+    now = time.monotonic()
+    if source._start is None:
+        source._start = (now, timestamp)
+        return
+    wall_start, stream_start = source._start
+    delay = (timestamp - stream_start) - (now - wall_start)
+    if delay > 0:
+        time.sleep(delay)
+
+
+class FrameRecorder:
+    """
+    Appends frames and timestamps to a recorded-frames file. write() only
+    queues the frame; a background thread does the disk I/O. Once
+    max_queued frames are waiting, write() blocks for up to put_timeout
+    seconds, so a slow disk slows the session down rather than losing
+    frames. Only a frame that still cannot be queued then is dropped, and
+    counted in frames_dropped.
+
+    An error in the background thread is logged once and ends the
+    recording; write() then returns without queueing, so the session goes
+    on. close() logs frames_written, frames_dropped and the error, if any,
+    and never raises.
+    """
+
+    def __init__(self, path, max_queued=120, put_timeout=1.0):
+        self.path = path
+        self.shape = None
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.error = None
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._file = None
+        self._thread = threading.Thread(target=self._writer, name='FrameRecorder', daemon=True)
+        self._thread.start()
+
+    def write(self, img, timestamp=None):
+        if self.error is not None:
+            return
+        try:
+            self._queue.put((time.monotonic() if timestamp is None else timestamp, img), timeout=self.put_timeout)
+        except queue.Full:
+            self.frames_dropped += 1
+
+    def _open(self, shape):
+        height, width, channels = shape
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= RECORDING_HEADER.itemsize:
+            header = np.fromfile(self.path, dtype=RECORDING_HEADER, count=1)[0]
+            existing = (int(header['height']), int(header['width']), int(header['channels']))
+            if header['magic'] != RECORDING_MAGIC or existing != tuple(shape):
+                raise ValueError(f'{self.path} holds {existing} frames, cannot append {tuple(shape)}')
+            self._file = open(self.path, 'r+b')
+            # Drop a partial record left by an interrupted recording so
+            # appended records stay aligned
+            record_size = record_dtype(*shape).itemsize
+            records = (os.path.getsize(self.path) - RECORDING_HEADER.itemsize) // record_size
+            self._file.truncate(RECORDING_HEADER.itemsize + records * record_size)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(self.path, 'wb')
+            header = np.zeros(1, dtype=RECORDING_HEADER)
+            header['magic'] = RECORDING_MAGIC
+            header['height'], header['width'], header['channels'] = height, width, channels
+            self._file.write(header.tobytes())
+        self.shape = tuple(shape)
+        self._record = np.zeros(1, dtype=record_dtype(*shape))
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                # Keep draining so write() and close() never block
+                continue
+            timestamp, img = item
+            try:
+                if self._file is None:
+                    self._open(img.shape)
+                if img.shape != self.shape:
+                    continue
+                self._record['timestamp'] = timestamp
+                self._record['frame'] = img
+                self._file.write(self._record.tobytes())
+                self.frames_written += 1
+            except (OSError, ValueError) as e:
+                self.error = e
+                logger.error('recording to %s stopped: %s', self.path, e)
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError as e:
+                if self.error is None:
+                    self.error = e
+                    logger.error('recording to %s stopped: %s', self.path, e)
+
+    def stats(self):
+        return {
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'error': None if self.error is None else str(self.error),
+        }
+
+    def close(self):
+        """
+        Waits for queued frames to be written, logs the totals and returns
+        stats().
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            level = logging.WARNING if self.error is not None or self.frames_dropped else logging.INFO
+            logger.log(level, 'recorded %d frames to %s, dropped %d%s', self.frames_written, self.path,
+                       self.frames_dropped, '' if self.error is None else f' (stopped early: {self.error})')
+        return self.stats()
+
+
+class RecordingSource:
+    """
+    Wraps another frame source and hands every frame it reads to a
+    FrameRecorder, so a live session can be replayed later.
+    """
+
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+
+    @property
+    def timestamp(self):
+        return self.source.timestamp
+
+    def read(self):
+        success, img = self.source.read()
+        if success:
+            self.recorder.write(img, self.source.timestamp)
+        return success, img
+
+    def grab(self):
+        return self.read()[0]
+
+    def get(self, prop_id):
+        return self.source.get(prop_id)
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def release(self):
+        try:
+            self.source.release()
+        finally:
+            self.recorder.close()
+
+
+def open_frame_source(spec=0, realtime=False, loop=False, record=None):
+    """
+    Opens a frame source from a command-line style spec: a camera index
+    such as 0 or '0', a recorded-frames file ending in .frames, or any
+    video file OpenCV can decode. With record set to a path, every frame
+    read is also appended to that recorded-frames file.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        source = CameraSource(int(spec))
+    elif str(spec).endswith(RECORDING_SUFFIX):
+        source = RecordedFrameSource(spec, realtime=realtime, loop=loop)
+    else:
+        source = VideoFileSource(spec, realtime=realtime, loop=loop)
+    if record:
+        source = RecordingSource(source, FrameRecorder(record))
+    return source
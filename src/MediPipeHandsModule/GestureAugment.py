@@ -0,0 +1,114 @@
+import numpy as np
+from src.MediPipeHandsModule.LandmarkFeatures import NUM_FEATURES, NUM_LANDMARKS
+
+# Label of each gesture seen in a mirror. The games read 1 as up, 2 as left,
+# 3 as down and 4 as right, so left and right swap (add_gesture_4.py made 4
+# from mirrored 2s) and up and down stay. Rows whose label is missing here
+# are never mirrored.
+MIRROR_LABELS = {1: 1, 2: 4, 3: 3, 4: 2}
+
+
+def mirror(xy):
+    """
+    Mirrors wrist-relative (N, 21, 2) landmarks left to right.
+    """
+    out = xy.copy()
+    out[..., 0] *= -1.0
+    return out
+
+
+def rotate(xy, angles):
+    """
+    Rotates each hand of (N, 21, 2) landmarks about the wrist by its angle
+    in radians.
+    """
+    cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+    x, y = xy[..., 0], xy[..., 1]
+    return np.stack((x * cos - y * sin, x * sin + y * cos), axis=-1)
+
+
+def split_features(features):
+    """
+    Splits (N, 43) handedness-plus-landmarks rows, or (N, 42) landmark
+    rows, into (handedness or None, (N, 21, 2) landmarks).
+    """
+    features = np.asarray(features, dtype=np.float64)
+    if features.shape[1] == NUM_FEATURES:
+        return features[:, 0], features[:, 1:].reshape(-1, NUM_LANDMARKS, 2)
+    return None, features.reshape(-1, NUM_LANDMARKS, 2)
+
+
+def join_features(handedness, xy):
+    landmarks = xy.reshape(len(xy), -1)
+    if handedness is None:
+        return landmarks
+    return np.column_stack((handedness, landmarks))
+
+
+class GestureAugmenter:
+    """
+    Random, label-aware perturbations of whole batches of training rows:
+
+      mirror      probability of mirroring a row, relabelling it through
+                  mirror_labels; handedness is kept unless
+                  flip_handedness, as add_gesture_4.py did
+      rotation    largest rotation about the wrist, in degrees
+      scale       largest relative change of hand size
+      aspect      largest relative change of width against height
+      noise       standard deviation of per-landmark noise
+
+    Rows are features as GestureEvaluator takes them, (N, 43) or (N, 42).
+    The wrist stays at the origin, so augmented rows remain valid
+    features. Call it on a batch, or stream any number of augmented rows
+    from a small base set with batches().
+    """
+
+    def __init__(self, mirror=0.5, rotation=10.0, scale=0.1, aspect=0.1, noise=0.01,
+                 mirror_labels=None, flip_handedness=False, seed=0):
+        self.mirror = mirror
+        self.rotation = np.radians(rotation)
+        self.scale = scale
+        self.aspect = aspect
+        self.noise = noise
+        self.mirror_labels = dict(MIRROR_LABELS if mirror_labels is None else mirror_labels)
+        self.flip_handedness = flip_handedness
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, features, labels):
+        """
+        Returns augmented copies of (features, labels).
+        """
+        handedness, xy = split_features(features)
+        labels = np.array(labels, copy=True)
+        rng = self.rng
+        n = len(xy)
+
+        if self.mirror:
+            mirrorable = np.isin(labels, list(self.mirror_labels))
+            flip = mirrorable & (rng.random(n) < self.mirror)
+            xy = np.where(flip[:, None, None], mirror(xy), xy)
+            labels[flip] = [self.mirror_labels[label] for label in labels[flip].tolist()]
+            if self.flip_handedness and handedness is not None:
+                handedness = np.where(flip, 1.0 - handedness, handedness)
+        if self.rotation:
+            xy = rotate(xy, rng.uniform(-self.rotation, self.rotation, n))
+        if self.scale or self.aspect:
+            scale = 1.0 + rng.uniform(-self.scale, self.scale, n)
+            aspect = 1.0 + rng.uniform(-self.aspect, self.aspect, n)
+            xy = xy * np.stack((scale * aspect, scale / aspect), axis=-1)[:, None, :]
+        if self.noise:
+            xy = xy + rng.normal(0.0, self.noise, xy.shape)
+            xy[:, 0] = 0.0
+        return join_features(handedness, xy), labels
+
+    def batches(self, features, labels, size, batch_size=256):
+        """
+        Yields (features, labels) batches of augmented rows, size rows in
+        all, each row drawn at random from the base set. Only one batch is
+        held at a time, so size is not limited by memory.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels)
+        for start in range(0, size, batch_size):
+            picks = self.rng.integers(len(features), size=min(batch_size, size - start))
+            yield self(features[picks], labels[picks])
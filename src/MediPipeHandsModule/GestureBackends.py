@@ -0,0 +1,87 @@
+import os
+from src.MediPipeHandsModule.GestureEvaluator import GestureEvaluator
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX, ModelArtifact
+
+# Every gesture evaluator provides:
+#   evaluate(landmarks, handedness, bbox) -> array with one label
+#   evaluate_batch(features, handedness=None) -> (labels, probabilities)
+#   classes: label of each probability column
+#   n_features: width of a feature row evaluate_batch expects
+#   model: the underlying model, loaded on first access
+EVALUATOR_ATTRIBUTES = ('evaluate', 'evaluate_batch', 'classes', 'n_features', 'model')
+
+# The labels behind CNN outputs 0..3 in pickles from the old train_cnn.py,
+# which store none; CNN artifacts record their own
+GESTURE_LABELS = (1, 2, 3, 4)
+
+# name -> (factory(model_path, **options), default model path relative to the project root)
+BACKENDS = {}
+
+
+def register_backend(name, factory, default_model):
+    BACKENDS[name] = (factory, default_model)
+
+
+def create_evaluator(name, model_path=None, root='.', **options):
+    """
+    Builds the evaluator registered as name, on model_path or the
+    backend's default model under root. Options go to the factory.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f'unknown gesture backend: {name} (choose from {", ".join(BACKENDS)})')
+    factory, default_model = BACKENDS[name]
+    return factory(model_path or os.path.join(root, default_model), **options)
+
+
+def _cnn_evaluator(path, **options):
+    # Imported here so the other backends never pull in torch
+    from src.MediPipeHandsModule.GestureEvaluatorCNN import GestureEvaluatorCNN
+    if not path.endswith(ARTIFACT_SUFFIX):
+        options.setdefault('labels', GESTURE_LABELS)
+    return GestureEvaluatorCNN(path, **options)
+
+
+def _online_evaluator(path, **options):
+    # The file only exists once a capture session has published it; fail
+    # here rather than on the first frame of a game
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'{path} does not exist yet; publish it with scripts/capture.py --online')
+    return GestureEvaluator(path, backend='compiled', watch=True, **options)
+
+
+def evaluator_for_file(path):
+    """
+    Picks an evaluator for any model file: 'cnn' artifacts and pickles
+    with cnn in their name get GestureEvaluatorCNN, everything else
+    GestureEvaluator.
+    """
+    if path.endswith(ARTIFACT_SUFFIX):
+        if ModelArtifact(path).kind == 'cnn':
+            return _cnn_evaluator(path)
+        return GestureEvaluator(path)
+    if 'cnn' in os.path.basename(path):
+        return _cnn_evaluator(path)
+    return GestureEvaluator(path)
+
+
+register_backend('forest', lambda path, **options: GestureEvaluator(path, **options),
+                 'models/gesture_model.gmodel')
+register_backend('sklearn', lambda path, **options: GestureEvaluator(path, backend='sklearn', **options),
+                 'models/gesture_model.pkl')
+register_backend('compiled', lambda path, **options: GestureEvaluator(path, backend='compiled', **options),
+                 'models/gesture_model.pkl')
+register_backend('knn', lambda path, **options: GestureEvaluator(path, backend='compiled', **options),
+                 'models/gesture_model_knn.gmodel')
+register_backend('knn-kdtree', lambda path, **options: GestureEvaluator(path, backend='compiled', knn_index='kdtree', **options),
+                 'models/gesture_model_knn.gmodel')
+register_backend('knn-prototypes', lambda path, **options: GestureEvaluator(path, backend='compiled', knn_index='prototypes', **options),
+                 'models/gesture_model_knn.gmodel')
+register_backend('knn-sklearn', lambda path, **options: GestureEvaluator(path, **options),
+                 'models/gesture_model_knn.pkl')
+register_backend('mlp', lambda path, **options: GestureEvaluator(path, **options),
+                 'models/gesture_model_mlp.gmodel')
+# The model capture.py --online republishes as captures come in
+register_backend('online', _online_evaluator,
+                 'models/gesture_model_online.gmodel')
+register_backend('cnn', _cnn_evaluator,
+                 'models/gesture_model_cnn.gmodel')
@@ -0,0 +1,304 @@
+import csv
+import glob
+import os
+import numpy as np
+from src.MediPipeHandsModule.LandmarkFeatures import NUM_LANDMARK_FEATURES
+from src.MediPipeHandsModule.ModelArtifact import ModelArtifact, file_hash, write_artifact
+
+# Gesture CSVs are converted once into 'dataset' artifacts (see ModelArtifact)
+# named after the sha256 of the CSV, so an edited file gets a new cache entry
+# and an unchanged one is never parsed again. Columns are stored separately:
+# labels (int64), handedness (int8, 0 = left, 1 = right, -1 when the file has
+# no hand column) and landmarks (float64, (N, 42)).
+DATASET_SUFFIX = '.gdata'
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', '.cache')
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+class GestureCsvReader:
+    """
+    Streams a capture CSV as (labels, handedness, landmarks) chunks of up
+    to chunk_rows rows, so files of any size parse in bounded memory.
+    Accepts the layouts in data/: label, hand, 42 values (with or without
+    a header row) and label, 42 values. Blank lines are skipped.
+
+    Rows with the wrong column count, a non-integer label, an unknown hand
+    or a non-finite value are rejected: on_error(line, reason) is called
+    for each if given, otherwise the first one raises ValueError. header
+    (the header row or None) and has_hand are set once the first data row
+    is read.
+    """
+
+    def __init__(self, path, chunk_rows=4096, on_error=None):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.on_error = on_error
+        self.header = None
+        self.has_hand = None
+        self.width = None
+        # File line number of each row in the chunk last yielded
+        self.lines = np.empty(0, dtype=np.int64)
+
+    def __iter__(self):
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            pending = []
+            for row in reader:
+                if not row:
+                    continue
+                if self.has_hand is None:
+                    if not _is_number(row[0]):
+                        self.header = row
+                        continue
+                    self.has_hand = len(row) > 1 and not _is_number(row[1])
+                    self.width = (2 if self.has_hand else 1) + NUM_LANDMARK_FEATURES
+                pending.append((reader.line_num, row))
+                if len(pending) >= self.chunk_rows:
+                    yield self._parse(pending)
+                    pending = []
+            if pending:
+                yield self._parse(pending)
+
+    def _reject(self, line, reason):
+        if self.on_error is None:
+            raise ValueError(f'{self.path}:{line}: {reason}')
+        self.on_error(line, reason)
+
+    def _check(self, row):
+        if len(row) != self.width:
+            return f'{len(row)} columns instead of {self.width}'
+        try:
+            label = float(row[0])
+        except ValueError:
+            return f'label {row[0]!r} is not a number'
+        if not label.is_integer():
+            return f'label {row[0]!r} is not an integer'
+        if self.has_hand and row[1].strip().lower() not in ('left', 'right'):
+            return f'unknown hand {row[1]!r}'
+        return None
+
+    def _parse(self, pending):
+        rows = []
+        for line, row in pending:
+            reason = self._check(row)
+            if reason is None:
+                rows.append((line, row))
+            else:
+                self._reject(line, reason)
+
+        first = self.width - NUM_LANDMARK_FEATURES
+        try:
+            landmarks = np.array([row[first:] for _, row in rows], dtype=np.float64).reshape(-1, NUM_LANDMARK_FEATURES)
+        except ValueError:
+            # Find the unparsable rows one by one, then convert the rest
+            parsed = []
+            for line, row in rows:
+                try:
+                    parsed.append((line, row, np.array(row[first:], dtype=np.float64)))
+                except ValueError:
+                    self._reject(line, 'landmark value is not a number')
+            rows = [(line, row) for line, row, _ in parsed]
+            landmarks = np.array([values for _, _, values in parsed]).reshape(-1, NUM_LANDMARK_FEATURES)
+
+        finite = np.isfinite(landmarks).all(axis=1)
+        for index in np.flatnonzero(~finite):
+            self._reject(rows[index][0], 'non-finite landmark value')
+        rows = [row for row, ok in zip(rows, finite) if ok]
+        landmarks = landmarks[finite]
+
+        self.lines = np.array([line for line, _ in rows], dtype=np.int64)
+        labels = np.array([int(float(row[0])) for _, row in rows], dtype=np.int64)
+        if self.has_hand:
+            handedness = np.array([row[1].strip().lower() == 'right' for _, row in rows], dtype=np.int8)
+        else:
+            handedness = np.full(len(rows), -1, dtype=np.int8)
+        return labels, handedness, landmarks
+
+
+def parse_gesture_csv(path):
+    """
+    Parses a whole capture CSV (see GestureCsvReader) into (labels,
+    handedness, landmarks), raising ValueError on the first bad row.
+    """
+    chunks = list(GestureCsvReader(path))
+    if not chunks:
+        return np.empty(0, np.int64), np.empty(0, np.int8), np.empty((0, NUM_LANDMARK_FEATURES))
+    return tuple(np.concatenate(column) for column in zip(*chunks))
+
+
+class NearDuplicateFilter:
+    """
+    Drops rows that land in the same grid cell as a row already kept:
+    landmarks are quantized to resolution, and each row's label, hand
+    code and quantized landmarks are hashed to 64 bits in one vectorized
+    pass. Hashes of kept rows are held in sorted arrays, so filtering
+    streams chunk by chunk and memory grows with the distinct samples, not
+    the rows seen.
+
+    In 42 dimensions two close rows usually straddle some cell boundary,
+    so one grid catches few of them. grids > 1 adds randomly offset grids,
+    and a row sharing a cell with a kept row in any of them is dropped.
+    resolution 0 keeps only exact duplicates out.
+    """
+
+    def __init__(self, resolution=0.02, grids=1, seed=0):
+        self.resolution = resolution
+        rng = np.random.default_rng(seed)
+        # Odd random multipliers: a hash is the wrapping uint64 dot product
+        # of a row's integer key with them
+        self._multipliers = rng.integers(0, 2 ** 63, size=2 + NUM_LANDMARK_FEATURES, dtype=np.uint64) * 2 + 1
+        self._offsets = np.vstack((np.zeros(NUM_LANDMARK_FEATURES),
+                                   rng.uniform(0.0, resolution, (max(grids, 1) - 1, NUM_LANDMARK_FEATURES))))
+        if not resolution:
+            self._offsets = self._offsets[:1]
+        self._seen = [np.empty(0, dtype=np.uint64) for _ in self._offsets]
+
+    def hashes(self, labels, handedness, landmarks, grid=0):
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        if self.resolution:
+            cells = np.floor((landmarks + self._offsets[grid]) / self.resolution).astype(np.int64)
+        else:
+            # Exact duplicates: hash the bit patterns (+ 0.0 merges -0.0 into 0.0)
+            cells = (landmarks + 0.0).view(np.int64)
+        keys = np.column_stack((np.asarray(labels, dtype=np.int64), np.asarray(handedness, dtype=np.int64), cells))
+        return (keys.astype(np.uint64) * self._multipliers).sum(axis=1, dtype=np.uint64)
+
+    def keep(self, labels, handedness, landmarks):
+        """
+        Returns the mask of rows in this chunk to keep, and remembers them.
+        Rows are decided in order against every row kept so far, so the
+        result does not depend on how the file is split into chunks.
+        """
+        hashes = np.array([self.hashes(labels, handedness, landmarks, grid) for grid in range(len(self._offsets))])
+        # Rows sharing a cell with a row kept in an earlier chunk
+        fresh = ~np.any([np.isin(grid_hashes, seen) for grid_hashes, seen in zip(hashes, self._seen)], axis=0)
+        if len(hashes) == 1:
+            # One grid: within the chunk, the first row of each cell is kept
+            _, first = np.unique(hashes[0], return_index=True)
+            mask = np.zeros(len(labels), dtype=bool)
+            mask[first] = True
+            mask &= fresh
+        else:
+            # A row dropped in one grid must not block rows it only shares a
+            # cell with in another, so rows kept in this chunk are tracked
+            # one at a time
+            mask = np.zeros(len(labels), dtype=bool)
+            kept = [set() for _ in hashes]
+            for index in np.flatnonzero(fresh).tolist():
+                row = hashes[:, index].tolist()
+                if any(value in cells for value, cells in zip(row, kept)):
+                    continue
+                mask[index] = True
+                for value, cells in zip(row, kept):
+                    cells.add(value)
+        self._seen = [np.union1d(seen, grid_hashes[mask]) for grid_hashes, seen in zip(hashes, self._seen)]
+        return mask
+
+    @property
+    def kept(self):
+        return len(self._seen[0])
+
+
+class GestureDataset:
+    """
+    Labels, handedness codes and landmarks of one or more capture CSVs.
+    Loaded through load_dataset, the arrays are memory-mapped from the
+    cache.
+    """
+
+    def __init__(self, labels, handedness, landmarks, sources=()):
+        self.labels = labels
+        self.handedness = handedness
+        self.landmarks = landmarks
+        self.sources = list(sources)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def has_handedness(self):
+        return bool(len(self.handedness)) and bool((self.handedness >= 0).all())
+
+    @property
+    def features(self):
+        """
+        The (N, 43) handedness-plus-landmarks rows GestureEvaluator takes,
+        or the (N, 42) landmarks for files without a hand column.
+        """
+        if self.has_handedness:
+            return np.column_stack((self.handedness.astype(np.float64), self.landmarks))
+        return np.asarray(self.landmarks, dtype=np.float64)
+
+    @classmethod
+    def concatenate(cls, datasets):
+        datasets = [dataset for dataset in datasets if len(dataset)]
+        if not datasets:
+            return cls(np.empty(0, np.int64), np.empty(0, np.int8), np.empty((0, NUM_LANDMARK_FEATURES)))
+        if len({dataset.has_handedness for dataset in datasets}) > 1:
+            raise ValueError('cannot mix files with and without a hand column')
+        return cls(np.concatenate([d.labels for d in datasets]),
+                   np.concatenate([d.handedness for d in datasets]),
+                   np.concatenate([d.landmarks for d in datasets]),
+                   [source for d in datasets for source in d.sources])
+
+
+def cache_path(path, cache_dir=DEFAULT_CACHE_DIR, digest=None):
+    digest = digest or file_hash(path)
+    return os.path.join(cache_dir, f'{os.path.splitext(os.path.basename(path))[0]}-{digest[:16]}{DATASET_SUFFIX}')
+
+
+def load_dataset(path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """
+    Loads one capture CSV, from its cache entry when the file's content
+    hash has one, otherwise parsing it and writing the entry (and removing
+    entries for earlier versions of the same file). Returns
+    (dataset, cached).
+    """
+    if not use_cache:
+        return GestureDataset(*parse_gesture_csv(path), sources=[path]), False
+
+    digest = file_hash(path)
+    cached_path = cache_path(path, cache_dir, digest)
+    if os.path.exists(cached_path):
+        artifact = ModelArtifact(cached_path)
+        if artifact.metadata.get('hash') == digest:
+            return GestureDataset(artifact['labels'], artifact['handedness'], artifact['landmarks'],
+                                  sources=[path]), True
+
+    labels, handedness, landmarks = parse_gesture_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for stale in glob.glob(os.path.join(cache_dir, f'{glob.escape(stem)}-*{DATASET_SUFFIX}')):
+        if ModelArtifact(stale).metadata.get('source') == os.path.abspath(path):
+            os.remove(stale)
+    # Written under a temporary name so a reader never sees half a file
+    temporary = cached_path + '.tmp'
+    write_artifact(temporary, 'dataset', {'labels': labels, 'handedness': handedness, 'landmarks': landmarks},
+                   {'source': os.path.abspath(path), 'hash': digest, 'rows': len(labels)})
+    os.replace(temporary, cached_path)
+    return GestureDataset(labels, handedness, landmarks, sources=[path]), False
+
+
+def load_features(path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """
+    One capture CSV as (features, labels), with features laid out as
+    GestureDataset.features.
+    """
+    dataset, _ = load_dataset(path, cache_dir, use_cache)
+    return dataset.features, np.asarray(dataset.labels)
+
+
+def load_datasets(paths, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """
+    Loads and concatenates several capture CSVs. Returns (dataset,
+    number of files served from the cache).
+    """
+    loaded = [load_dataset(path, cache_dir, use_cache) for path in paths]
+    return GestureDataset.concatenate([dataset for dataset, _ in loaded]), sum(cached for _, cached in loaded)
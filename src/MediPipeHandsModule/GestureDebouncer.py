@@ -0,0 +1,119 @@
+import collections
+import time
+import numpy as np
+
+STRATEGIES = ('ema', 'hysteresis', 'agree', 'majority')
+
+
+class GestureDebouncer:
+    """
+    Turns per-frame class probabilities into a stable gesture.
+
+    Strategies:
+        ema:        exponentially smoothed probabilities; switches when the
+                    smoothed top class reaches threshold.
+        hysteresis: switches when a class's raw probability reaches
+                    threshold and holds it until it drops below release.
+        agree:      switches once the top class has been the same for
+                    agree frames in a row with at least release confidence.
+        majority:   the old behaviour, the most common top class over the
+                    last window frames once the window is full.
+
+    update() returns the current gesture, or None before the first switch.
+    The gesture is held when frames have no hand, like the games always did.
+
+    Added latency is measured per switch as the time (and frames) from the
+    first frame the new class was on top to the frame the output switched.
+    """
+
+    def __init__(self, classes, strategy='ema', alpha=0.5, threshold=0.6, release=0.4, agree=2,
+                 window=5):
+        if strategy not in STRATEGIES:
+            raise ValueError(f'unknown debounce strategy: {strategy}')
+        self.classes = np.asarray(classes)
+        self.strategy = strategy
+        self.alpha = alpha
+        self.threshold = threshold
+        self.release = release
+        self.agree = agree
+        self.window = window
+
+        self.latencies = collections.deque(maxlen=100)
+        self.frame_latencies = collections.deque(maxlen=100)
+        self.switches = 0
+        self.reset()
+
+    def reset(self):
+        self.gesture = None
+        self._index = None
+        self._smoothed = None
+        self._streak = 0
+        self._recent = collections.deque(maxlen=self.window)
+        self._frame = 0
+        # (class index, timestamp, frame) of the current raw top class's onset
+        self._onset = None
+
+    def update(self, probabilities, timestamp=None):
+        now = time.monotonic() if timestamp is None else timestamp
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        self._frame += 1
+        top = int(probabilities.argmax())
+        if self._onset is None or self._onset[0] != top:
+            self._onset = (top, now, self._frame)
+            self._streak = 0
+        self._streak += 1
+
+        index = getattr(self, '_update_' + self.strategy)(probabilities, top)
+        if index is not None and index != self._index:
+            self._switch(index, now)
+        return self.gesture
+
+    def _update_ema(self, probabilities, top):
+        if self._smoothed is None:
+            self._smoothed = probabilities.copy()
+        else:
+            self._smoothed *= 1.0 - self.alpha
+            self._smoothed += self.alpha * probabilities
+        best = int(self._smoothed.argmax())
+        return best if self._smoothed[best] >= self.threshold else None
+
+    def _update_hysteresis(self, probabilities, top):
+        if self._index is not None and probabilities[self._index] >= self.release:
+            return self._index
+        return top if probabilities[top] >= self.threshold else None
+
+    def _update_agree(self, probabilities, top):
+        if self._streak >= self.agree and probabilities[top] >= self.release:
+            return top
+        return None
+
+    def _update_majority(self, probabilities, top):
+        self._recent.append(top)
+        if len(self._recent) < self.window:
+            return None
+        return collections.Counter(self._recent).most_common(1)[0][0]
+
+    def _switch(self, index, now):
+        self._index = index
+        self.gesture = self.classes[index].item()
+        self.switches += 1
+        onset_index, onset_time, onset_frame = self._onset
+        if onset_index == index:
+            self.latencies.append(now - onset_time)
+            self.frame_latencies.append(self._frame - onset_frame)
+
+    @property
+    def added_latency(self):
+        """
+        Mean seconds between a class first coming out on top and the output
+        switching to it, over recent switches.
+        """
+        return float(np.mean(self.latencies)) if self.latencies else 0.0
+
+    def stats(self):
+        return {
+            'strategy': self.strategy,
+            'switches': self.switches,
+            'added_latency_ms': self.added_latency * 1000,
+            'added_latency_frames': float(np.mean(self.frame_latencies)) if self.frame_latencies else 0.0,
+        }
@@ -1,47 +1,127 @@
+import os
+import time
 import joblib
 import numpy as np
+from src.MediPipeHandsModule.CompiledForest import compile_forest
+from src.MediPipeHandsModule.CompiledKNN import CompiledKNN, compile_knn
+from src.MediPipeHandsModule.LandmarkFeatures import NUM_FEATURES, features_from_lm_list
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX, load_model
 
 class GestureEvaluator:
-    def __init__(self, model_path):
-        self.model = joblib.load(model_path)
-
-    def _normalize_landmarks(self, lm_list, bbox):
-        normalized_landmarks = []
-        if len(lm_list) != 0 and bbox:
-            wrist = lm_list[0]  # Wrist is the first landmark
-            bbox_width = bbox[2]
-            bbox_height = bbox[3]
-            for joint in lm_list:
-                try:
-                    # Get relative position to the wrist and scale by bbox dimensions
-                    normalized_x = (joint[1] - wrist[1]) / bbox_width
-                    normalized_y = (joint[2] - wrist[2]) / bbox_height
-                    normalized_landmarks.append((normalized_x, normalized_y))
-                except (TypeError, IndexError, ZeroDivisionError) as e:
-                    print(f"Error processing joint: {joint}, error: {e}")
-        return normalized_landmarks
+    def __init__(self, model_path, backend='sklearn', knn_index='brute', watch=False, watch_interval=0.5):
+        """
+        model_path is a joblib-pickled model or a .gmodel artifact (see
+        ModelArtifact). Nothing is loaded until the model is first used.
+
+        backend='compiled' replaces a random-forest model with its
+        CompiledForest, or a k-nearest-neighbours model with its
+        CompiledKNN searched with knn_index, which give the same labels at
+        a fraction of sklearn's per-call overhead. Artifacts are always
+        compiled.
+
+        watch=True reloads the model when the file's modification time
+        changes, checked at most every watch_interval seconds, so a model
+        republished under the same path (e.g. by capture.py --online) takes
+        effect in a running game. Writers must replace the file atomically
+        (os.replace) so a half-written model is never read.
+        """
+        if backend not in ('sklearn', 'compiled'):
+            raise ValueError(f'unknown backend: {backend}')
+        self.model_path = model_path
+        self.backend = backend
+        self.knn_index = knn_index
+        self._model = None
+        self.watch = watch
+        self.watch_interval = watch_interval
+        self.reloads = 0
+        self._mtime = None
+        self._checked = 0.0
+        # Reused for every single-hand evaluate call
+        self._features = np.empty((1, NUM_FEATURES))
+
+    def _check_for_update(self):
+        now = time.monotonic()
+        if now - self._checked < self.watch_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.model_path).st_mtime_ns
+        except OSError:
+            # Mid-replace or removed: keep the model already loaded
+            return
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self.reloads += self._model is not None
+            self._model = None
+
+    @property
+    def model(self):
+        if self.watch:
+            self._check_for_update()
+        if self._model is None:
+            if self.model_path.endswith(ARTIFACT_SUFFIX):
+                self._model = load_model(self.model_path)
+                if isinstance(self._model, CompiledKNN):
+                    self._model = compile_knn(self._model, self.knn_index)
+            else:
+                self._model = joblib.load(self.model_path)
+                if self.backend == 'compiled':
+                    if hasattr(self._model, 'estimators_'):
+                        self._model = compile_forest(self._model)
+                    else:
+                        self._model = compile_knn(self._model, self.knn_index)
+        return self._model
+
+    @property
+    def classes(self):
+        """
+        The model's labels, in probability column order.
+        """
+        return self.model.classes_
+
+    @property
+    def n_features(self):
+        return getattr(self.model, 'n_features_in_', NUM_FEATURES)
 
     def evaluate(self, landmarks, handedness, bbox):
         """
         Evaluates hand landmarks to determine a gesture.
         """
         # Encode handedness: 'Left' to 0, 'Right' to 1 (consistent with training)
-        encoded_handedness = 0
-        if handedness == 'Right':
-            encoded_handedness = 1
+        # (hand_detector.handedness_codes is already encoded this way)
+        if isinstance(handedness, str):
+            encoded_handedness = 1 if handedness == 'Right' else 0
+        else:
+            encoded_handedness = int(handedness)
 
-        # Normalize landmarks
-        normalized_lms = self._normalize_landmarks(landmarks, bbox)
-        
-        # Flatten normalized landmarks
-        landmark_features = [item for sublist in normalized_lms for item in sublist]
-
-        # Combine handedness and normalized landmarks
-        features = [encoded_handedness] + landmark_features
-        
-        input_features = np.array(features).reshape(1, -1)
+        # Handedness followed by the normalized landmarks
+        input_features = features_from_lm_list(landmarks, bbox, encoded_handedness, out=self._features)
+        if input_features is None:
+            raise ValueError('evaluate needs landmarks and a non-empty bbox')
 
         # Predict gesture
         gesture = self.model.predict(input_features)
 
         return gesture
+
+    def evaluate_batch(self, features, handedness=None):
+        """
+        Evaluates many hands with one model call, e.g. every hand in a
+        frame or several buffered frames.
+
+        features is an (N, 43) array of handedness code followed by the
+        normalized landmarks, or an (N, 42) array of landmarks with the
+        codes passed separately as handedness. Returns (labels, probabilities)
+        with probabilities shaped (N, num_classes) in model.classes_ order.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if handedness is not None:
+            features = np.column_stack((np.asarray(handedness, dtype=np.float64), features.reshape(len(features), -1)))
+        if not len(features):
+            return self.classes[:0], np.empty((0, len(self.classes)))
+
+        # One model for both, in case a watched file is reloaded in between
+        model = self.model
+        probabilities = model.predict_proba(features)
+        labels = model.classes_[probabilities.argmax(axis=1)]
+        return labels, probabilities
@@ -1,44 +1,108 @@
+import sys
 import joblib
 import numpy as np
 import torch
 from src.MediPipeHandsModule.CNNModel import CNN
+from src.MediPipeHandsModule.LandmarkFeatures import NUM_FEATURES, features_from_lm_list
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX, ModelArtifact, load_model
 
 class GestureEvaluatorCNN:
-    def __init__(self, model_path):
-        self.model = joblib.load(model_path)
-        self.model.eval()
-
-    def _normalize_landmarks(self, lm_list, bbox):
-        normalized_landmarks = []
-        if len(lm_list) != 0 and bbox:
-            wrist = lm_list[0]  # Wrist is the first landmark
-            bbox_width = bbox[2]
-            bbox_height = bbox[3]
-            for joint in lm_list:
-                try:
-                    # Get relative position to the wrist and scale by bbox dimensions
-                    normalized_x = (joint[1] - wrist[1]) / bbox_width
-                    normalized_y = (joint[2] - wrist[2]) / bbox_height
-                    normalized_landmarks.append((normalized_x, normalized_y))
-                except (TypeError, IndexError, ZeroDivisionError) as e:
-                    print(f"Error processing joint: {joint}, error: {e}")
-        return normalized_landmarks
+    def __init__(self, model_path, fast=False, num_threads=None, quantize=False, labels=None):
+        """
+        model_path is a joblib-pickled CNN or a .gmodel artifact (see
+        ModelArtifact). Nothing is loaded until the model is first used.
+
+        fast=True runs evaluate through a traced and frozen copy of the
+        model under inference_mode, with features written straight into
+        preallocated input tensors. quantize=True (implies fast) also
+        converts the linear layers to dynamically quantized int8 first.
+        num_threads sets torch's intra-op thread count, which is process
+        wide; 1 keeps torch off the cores MediaPipe and pygame use.
+
+        labels maps output indices to gesture labels (the sorted training
+        labels, as train_cnn.py's LabelEncoder assigned them). Artifacts
+        record their own, used when labels is None; for a pickle without
+        labels the raw output index is returned.
+        """
+        self.model_path = model_path
+        self.labels = None if labels is None else np.asarray(labels)
+        self.fast = fast or quantize
+        self.quantize = quantize
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self._model = None
+        self._runner = None
+        # Reused for every single-hand evaluate call. In fast mode this is a
+        # float32 view of the input tensor, so writing features fills it.
+        self._input = torch.zeros((1, NUM_FEATURES), dtype=torch.float32)
+        self._handedness_input = self._input[:, :1]
+        self._landmarks_input = self._input[:, 1:].view(1, 1, 6, 7)
+        self._features = self._input.numpy() if self.fast else np.empty((1, NUM_FEATURES))
+
+    @property
+    def model(self):
+        if self._model is None:
+            if self.model_path.endswith(ARTIFACT_SUFFIX):
+                self._model = load_model(self.model_path)
+                if self.labels is None:
+                    self.labels = np.asarray(ModelArtifact(self.model_path).metadata['labels'])
+            else:
+                # train_cnn.py pickled the model as __main__.CNN
+                main = sys.modules['__main__']
+                if not hasattr(main, 'CNN'):
+                    main.CNN = CNN
+                self._model = joblib.load(self.model_path)
+                self._model.eval()
+        return self._model
+
+    @property
+    def classes(self):
+        """
+        The label of each output, in probability column order.
+        """
+        model = self.model
+        if self.labels is not None:
+            return self.labels
+        return np.arange(model.fc2.out_features)
+
+    @property
+    def n_features(self):
+        return NUM_FEATURES
+
+    @property
+    def runner(self):
+        """
+        The traced, frozen (and optionally quantized) model fast mode uses.
+        """
+        if self._runner is None:
+            model = self.model
+            if self.quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            with torch.inference_mode():
+                traced = torch.jit.trace(model, (self._landmarks_input, self._handedness_input))
+            self._runner = torch.jit.freeze(traced.eval())
+        return self._runner
 
     def evaluate(self, landmarks, handedness, bbox):
         """
         Evaluates hand landmarks to determine a gesture using a CNN model.
         """
         # Encode handedness: 'Left' to 0, 'Right' to 1
-        encoded_handedness = 0
-        if handedness == 'Right':
-            encoded_handedness = 1
+        # (hand_detector.handedness_codes is already encoded this way)
+        if isinstance(handedness, str):
+            encoded_handedness = 1 if handedness == 'Right' else 0
+        else:
+            encoded_handedness = int(handedness)
 
-        # Normalize landmarks
-        normalized_lms = self._normalize_landmarks(landmarks, bbox)
-        
-        # Reshape landmarks for CNN input
-        landmark_features = np.array([item for sublist in normalized_lms for item in sublist])
-        landmarks_reshaped = landmark_features.reshape(1, 1, 6, 7)
+        # Normalize landmarks and reshape them for CNN input
+        features = features_from_lm_list(landmarks, bbox, encoded_handedness, out=self._features)
+        if features is None:
+            raise ValueError('evaluate needs landmarks and a non-empty bbox')
+        if self.fast:
+            with torch.inference_mode():
+                return self.classes[self.runner(self._landmarks_input, self._handedness_input).argmax(dim=1).numpy()]
+
+        landmarks_reshaped = features[:, 1:].reshape(1, 1, 6, 7)
 
         # Convert to PyTorch tensors
         landmarks_tensor = torch.tensor(landmarks_reshaped, dtype=torch.float32)
@@ -48,4 +112,28 @@ class GestureEvaluatorCNN:
         with torch.no_grad():
             outputs = self.model(landmarks_tensor, handedness_tensor)
             _, predicted = torch.max(outputs.data, 1)
-            return predicted.numpy()
+            return self.classes[predicted.numpy()]
+
+    def evaluate_batch(self, landmarks, handedness=None):
+        """
+        Evaluates many hands with one forward pass.
+
+        landmarks is an (N, 1, 6, 7) or (N, 42) array of normalized
+        landmarks with the handedness codes passed as handedness, or an
+        (N, 43) array with the code in the first column. Returns
+        (labels, probabilities) like evaluate, with softmax probabilities
+        shaped (N, num_classes).
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        if not len(landmarks):
+            return self.classes[:0], np.empty((0, len(self.classes)), dtype=np.float32)
+        if handedness is None:
+            flat = landmarks.reshape(len(landmarks), -1)
+            handedness, landmarks = flat[:, 0], flat[:, 1:]
+        landmarks = landmarks.reshape(-1, 1, 6, 7)
+        handedness = np.asarray(handedness, dtype=np.float32).reshape(-1, 1)
+
+        with torch.inference_mode():
+            outputs = self.model(torch.from_numpy(landmarks), torch.from_numpy(handedness))
+            probabilities = torch.softmax(outputs, dim=1).numpy()
+        return self.classes[probabilities.argmax(axis=1)], probabilities
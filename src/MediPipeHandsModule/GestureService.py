@@ -0,0 +1,153 @@
+import collections
+import logging
+import threading
+import time
+import cv2
+from src.MediPipeHandsModule.LandmarkFeatures import features_from_detector
+
+# What the service publishes for every processed camera frame. gesture is the
+# debounced gesture (None until the debouncer first commits), confidence the
+# classifier's probability for this frame's top class (0.0 with no hand),
+# timestamp the capture time of the frame, preview the mirrored frame with
+# landmarks and bbox drawn on it, and seq the CameraCapture sequence number.
+# error is the exception that stopped the frame from being processed, if
+# any; such a state has no gesture and the unprocessed frame as its preview.
+GestureState = collections.namedtuple('GestureState', 'gesture confidence timestamp preview seq error',
+                                      defaults=(None,))
+
+logger = logging.getLogger(__name__)
+
+
+class GestureService:
+    """
+    Runs the gesture pipeline on a worker thread: newest frame from a
+    CameraCapture, mirror, hand detection, features, classification of the
+    first hand and debouncing. The latest GestureState is published under a
+    lock, and latest() never blocks, so a game loop only polls it.
+
+    The worker idles while the capture is paused, so the menu costs
+    nothing. Call reset() with a fresh debouncer when a game starts.
+    A frame that raises is published as a state with its error and no
+    gesture, so the game never sits on a stale gesture, and the worker
+    moves on to the next frame; error holds the latest such exception.
+    With a LandmarkRecorder as landmark_recorder, every processed frame's
+    detections are appended to its stream; close it after stop().
+    """
+
+    def __init__(self, capture, detector, evaluator, debouncer=None, mirror=True, landmark_recorder=None):
+        self.capture = capture
+        self.detector = detector
+        self.evaluator = evaluator
+        self.debouncer = debouncer
+        self.mirror = mirror
+        self.landmark_recorder = landmark_recorder
+
+        self._lock = threading.Lock()
+        self._state = None
+        self._last_seq = 0
+        self._generation = 0
+        self._running = False
+        self._thread = None
+
+        self.frames = 0
+        self.busy_time = 0.0
+        self.errors = 0
+        self.error = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="GestureService", daemon=True)
+        self._thread.start()
+        return self
+
+    def reset(self, debouncer=None):
+        """
+        Drops the published state and swaps in a new debouncer, so a new
+        game does not start on the previous game's gesture.
+        """
+        with self._lock:
+            if debouncer is not None:
+                self.debouncer = debouncer
+            self._state = None
+            self._generation += 1
+
+    def _worker(self):
+        while self._running:
+            latest = self.capture.read_latest(self._last_seq)
+            if latest is None:
+                time.sleep(self.capture.frame_interval / 4)
+                continue
+            start = time.perf_counter()
+            self._last_seq, timestamp, img = latest
+            generation = self._generation
+            try:
+                state = self.process(img, timestamp, self._last_seq)
+            except Exception as e:
+                state = self._failed(e, img, timestamp, self._last_seq)
+            with self._lock:
+                # Drop a frame that was in flight when reset() was called
+                if generation == self._generation:
+                    self._state = state
+            self.frames += 1
+            self.busy_time += time.perf_counter() - start
+
+    def _failed(self, error, img, timestamp, seq):
+        # Called from the except block; logs each new kind of failure once
+        # rather than on every frame
+        if self.error is None or (type(error), str(error)) != (type(self.error), str(self.error)):
+            logger.exception('gesture pipeline failed on frame %d', seq)
+        self.errors += 1
+        self.error = error
+        return GestureState(None, 0.0, timestamp, img, seq, error)
+
+    def process(self, img, timestamp, seq=0):
+        """
+        Runs one frame through the pipeline and returns its GestureState.
+        """
+        if self.mirror:
+            img = cv2.flip(img, 1)
+        img = self.detector.find_hands(img)
+        if self.landmark_recorder is not None:
+            self.landmark_recorder.write(self.detector, img.shape, timestamp)
+        self.detector.get_bbox_location(img)
+        _, features = features_from_detector(self.detector)
+
+        debouncer = self.debouncer
+        gesture = debouncer.gesture if debouncer is not None else None
+        confidence = 0.0
+        if len(features):
+            labels, probabilities = self.evaluator.evaluate_batch(features[:1])
+            confidence = float(probabilities[0].max())
+            # A watched model reloaded with a new label no longer matches the
+            # debouncer's columns; its raw labels are used until the next reset
+            if debouncer is not None and len(probabilities[0]) == len(debouncer.classes):
+                gesture = debouncer.update(probabilities[0], timestamp)
+            else:
+                gesture = labels[0].item()
+        elif debouncer is None and self._state is not None:
+            # Hold the last gesture while the hand is out of view
+            gesture = self._state.gesture
+        return GestureState(gesture, confidence, timestamp, img, seq)
+
+    def latest(self):
+        """
+        The most recently published GestureState, or None before the first
+        frame since start or reset().
+        """
+        with self._lock:
+            return self._state
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'mean_ms': self.busy_time / self.frames * 1000 if self.frames else 0.0,
+            'errors': self.errors,
+        }
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
@@ -1,30 +1,265 @@
 import cv2
 import mediapipe as mp
 import time
+import warnings
 import numpy as np
-from google.protobuf.json_format import MessageToDict
 #init camera on camera 0 (inbuilt)
 
+def parse_size(text):
+    """
+    Parses a 'WIDTHxHEIGHT' string such as '320x240' into a (width, height) tuple.
+    """
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+LANDMARK_IDS = np.arange(21)
+NO_HANDS = np.zeros((0, 21, 3), dtype=np.float32)
+PADDING = np.float64(0.1)
+
+# A serialized NormalizedLandmark with x, y and z set is 17 bytes: list field
+# key + length, then key + little-endian float32 for each coordinate.
+_LANDMARK_BYTES = 17
+_KEY_COLUMNS = [0, 1, 2, 7, 12]
+_KEYS = np.array([0x0a, 0x0f, 0x0d, 0x15, 0x1d], dtype=np.uint8)
+_VALUE_COLUMNS = [3, 4, 5, 6, 8, 9, 10, 11, 13, 14, 15, 16]
+
+def landmarks_from_results(results):
+    """
+    Packs MediaPipe hand results into a (num_hands, 21, 3) float32 array of
+    normalized landmarks.
+
+    Reads the float32 values straight out of the serialized protobufs,
+    which avoids 63 Python attribute reads per hand. Falls back to the
+    attribute loop if the wire layout is not the expected one.
+    """
+    hands = results.multi_hand_landmarks
+    if not hands:
+        return NO_HANDS
+    raw = np.frombuffer(b''.join([hand.SerializeToString() for hand in hands]), dtype=np.uint8)
+    if raw.size == len(hands) * 21 * _LANDMARK_BYTES:
+        raw = raw.reshape(-1, _LANDMARK_BYTES)
+        if (raw[:, _KEY_COLUMNS] == _KEYS).all():
+            return np.ascontiguousarray(raw[:, _VALUE_COLUMNS]).view('<f4').reshape(len(hands), 21, 3)
+    return np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hands], dtype=np.float32)
+
+HANDEDNESS_LABELS = ('Left', 'Right')
+NO_HANDEDNESS = (np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+def handedness_from_results(results):
+    """
+    Returns (codes, scores) for the detected hands, read directly from the
+    classification messages: int8 codes with 0=Left, 1=Right (the encoding
+    the gesture models were trained with) and float32 scores.
+    """
+    if not results.multi_hand_landmarks or not results.multi_handedness:
+        return NO_HANDEDNESS
+    top = [hand_handedness.classification[0] for hand_handedness in results.multi_handedness]
+    codes = np.array([classification.label == 'Right' for classification in top], dtype=np.int8)
+    scores = np.array([classification.score for classification in top], dtype=np.float32)
+    return codes, scores
+
 class hand_detector():
-    def __init__(self, mode=False, max_hands=2, detection_con=0.5, track_con=0.5):
+    def __init__(self, mode=False, max_hands=2, detection_con=0.5, track_con=0.5, inference_size=None,
+                 roi_tracking=False, roi_padding=0.5, roi_edge_margin=0.03, roi_min_size=96):
         self.mode = mode
         self.max_hands = max_hands
         self.detection_con = detection_con
         self.track_con = track_con
+        # (width, height) MediaPipe sees; None runs on the full frame.
+        # Landmarks are normalized, so they still map onto the full frame.
+        self.inference_size = inference_size
+
+        # ROI tracking: detect in a crop around the first hand's last position
+        # and only go back to the full frame when it is lost or at the crop edge.
+        # The crop holds one hand, so a second hand would be lost
+        if roi_tracking and max_hands > 1:
+            warnings.warn(f'ROI tracking follows a single hand; disabled because max_hands is {max_hands}')
+            roi_tracking = False
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_edge_margin = roi_edge_margin
+        self.roi_min_size = roi_min_size
+        self.roi = None
+        self.roi_hits = 0
+        self.roi_fallbacks = 0
 
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(self.mode, self.max_hands, min_detection_confidence=self.detection_con, min_tracking_confidence=self.track_con)
+        # Crops move every frame, so they get their own tracker state
+        self.roi_hands = None
+        if self.roi_tracking:
+            self.roi_hands = self.mp_hands.Hands(self.mode, 1, min_detection_confidence=self.detection_con, min_tracking_confidence=self.track_con)
         self.mpDraw = mp.solutions.drawing_utils
+        self.init_landmark_cache()
+
+    def init_landmark_cache(self):
+        self.connections = sorted(self.mp_hands.HAND_CONNECTIONS)
+        self.results = None
+        self._landmarks = np.zeros((self.max_hands, 21, 3), dtype=np.float32)
+        self._scale = np.zeros(2)
+        self.set_landmarks(NO_HANDS, (0, 0))
+        self.set_handedness(*NO_HANDEDNESS)
+
+    def prepare_frame(self, img):
+        """
+        Returns the frame MediaPipe should see, downscaled once to
+        inference_size when one is set.
+        """
+        if self.inference_size is None:
+            return img
+        w, h = self.inference_size
+        if img.shape[1] == w and img.shape[0] == h:
+            return img
+        return cv2.resize(img, (w, h), interpolation=cv2.INTER_AREA)
 
     def find_hands(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
-        if self.results.multi_hand_landmarks:
-            for handLms in self.results.multi_hand_landmarks:
-                if draw:
-                    self.mpDraw.draw_landmarks(img, handLms, self.mp_hands.HAND_CONNECTIONS)
+        landmarks, codes, scores = self.detect(img)
+        self.set_landmarks(landmarks, img.shape)
+        self.set_handedness(codes, scores)
+        if draw:
+            self.draw_landmarks(img)
         return img
 
+    def detect(self, img):
+        """
+        Runs MediaPipe on img and returns (landmarks, handedness_codes,
+        handedness_scores), with landmarks normalized to the whole of img.
+        Nothing is cached; find_hands() does that.
+        """
+        if self.roi is not None:
+            detected = self._detect_roi(img)
+            if detected is not None:
+                self.roi_hits += 1
+                return detected
+            self.roi_fallbacks += 1
+
+        imgRGB = cv2.cvtColor(self.prepare_frame(img), cv2.COLOR_BGR2RGB)
+        self.results = self.hands.process(imgRGB)
+        landmarks = landmarks_from_results(self.results)
+        if self.roi_tracking:
+            self.roi = self._roi_around(landmarks, img.shape)
+        return (landmarks,) + handedness_from_results(self.results)
+
+    def _roi_around(self, landmarks, shape):
+        """
+        Returns a padded square (x0, y0, x1, y1) around the first hand,
+        shifted to lie inside the frame, or None when there is no hand or
+        the crop would be nearly as big as the frame.
+        """
+        if not len(landmarks):
+            return None
+        h, w = shape[:2]
+        x_min, y_min = landmarks[0, :, :2].min(axis=0) * (w, h)
+        x_max, y_max = landmarks[0, :, :2].max(axis=0) * (w, h)
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_padding)
+        side = int(max(side, self.roi_min_size))
+        if side * side > 0.6 * w * h:
+            return None
+        x0 = int(min(max((x_min + x_max - side) / 2, 0), max(w - side, 0)))
+        y0 = int(min(max((y_min + y_max - side) / 2, 0), max(h - side, 0)))
+        return x0, y0, min(x0 + side, w), min(y0 + side, h)
+
+    def _detect_roi(self, img):
+        h, w = img.shape[:2]
+        x0, y0, x1, y1 = self.roi
+        crop = img[y0:y1, x0:x1]
+        if self.inference_size is not None and self.inference_size[0] < w:
+            # Keep the same pixel density the full-frame pass would use
+            factor = self.inference_size[0] / w
+            crop = cv2.resize(crop, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+        results = self.roi_hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        landmarks = landmarks_from_results(results)
+        self.roi = None
+        if not len(landmarks):
+            return None
+
+        # A hand touching a crop edge that is not also a frame edge is
+        # probably cut off, so its landmarks cannot be trusted
+        margin = self.roi_edge_margin
+        lo = landmarks[0, :, :2].min(axis=0)
+        hi = landmarks[0, :, :2].max(axis=0)
+        if ((lo[0] < margin and x0 > 0) or (hi[0] > 1 - margin and x1 < w) or
+                (lo[1] < margin and y0 > 0) or (hi[1] > 1 - margin and y1 < h)):
+            return None
+
+        crop_w, crop_h = x1 - x0, y1 - y0
+        landmarks[:, :, 0] = (x0 + landmarks[:, :, 0] * crop_w) / w
+        landmarks[:, :, 1] = (y0 + landmarks[:, :, 1] * crop_h) / h
+        # z shares x's scale, which shrinks from crop width to frame width
+        landmarks[:, :, 2] *= crop_w / w
+        self.results = results
+        self.roi = self._roi_around(landmarks, img.shape)
+        return (landmarks,) + handedness_from_results(results)
+
+    def set_landmarks(self, normalized, shape):
+        """
+        Caches one frame of landmarks from a (num_hands, 21, 3) array of
+        normalized MediaPipe coordinates.
+
+        self.landmarks becomes a (num_hands, 21, 3) float32 array of
+        full-frame pixel x, y (truncated like int(lm.x * w)) and raw z.
+        Padded bboxes and mids for every hand are derived from it here with
+        array ops, so the getters below are cheap lookups. The buffer is
+        reused for the next frame; copy it to keep a frame's landmarks.
+        """
+        num_hands = len(normalized)
+        if num_hands > len(self._landmarks):
+            self._landmarks = np.zeros((num_hands, 21, 3), dtype=np.float32)
+        h, w = shape[:2]
+        if self._scale[0] != w or self._scale[1] != h:
+            self._scale = np.array((w, h), dtype=np.float64)
+
+        landmarks = self._landmarks[:num_hands]
+        # Scale in float64 so truncation matches the int() the lists used to use
+        np.trunc(normalized[:, :, :2] * self._scale, out=landmarks[:, :, :2], casting='unsafe')
+        landmarks[:, :, 2] = normalized[:, :, 2]
+        self.landmarks = landmarks
+        self._lm_lists = [None] * num_hands
+
+        xy = landmarks[:, :, :2]
+        xy_min = xy.min(axis=1)
+        xy_max = xy.max(axis=1)
+
+        #add 10% padding
+        buffer = np.trunc((xy_max - xy_min) * PADDING)
+        box_min = np.maximum(xy_min - buffer, 0)
+        self.bboxes = np.concatenate((box_min, xy_max + buffer - box_min), axis=1).astype(np.int64)
+        self.mids = self.bboxes[:, 2:] / 2
+
+    def set_handedness(self, codes, scores):
+        """
+        Caches one frame of handedness as int8 codes (0=Left, 1=Right) and
+        float32 scores, next to the landmarks of the same hands.
+        """
+        self.handedness_codes = codes
+        self.handedness_scores = scores
+        self._handedness_labels = [HANDEDNESS_LABELS[code] for code in codes.tolist()]
+
+    def draw_landmarks(self, img, hand_no=None):
+        """
+        Draws the cached landmarks and hand connections in MediaPipe's
+        default style without going back through the protobuf results.
+        """
+        hands = range(len(self.landmarks)) if hand_no is None else [hand_no]
+        h, w = img.shape[:2]
+        for index in hands:
+            xy = self.landmarks[index, :, :2].astype(np.int32)
+            inside = (xy[:, 0] >= 0) & (xy[:, 0] < w) & (xy[:, 1] >= 0) & (xy[:, 1] < h)
+            for start, end in self.connections:
+                if inside[start] and inside[end]:
+                    cv2.line(img, tuple(xy[start]), tuple(xy[end]), (224, 224, 224), 2)
+            for point in xy[inside]:
+                cv2.circle(img, tuple(point), 3, (224, 224, 224), 2)
+                cv2.circle(img, tuple(point), 2, (0, 0, 255), 2)
+
+    def get_landmark_array(self, hand_no=0):
+        """
+        Returns the cached (21, 3) pixel landmark array of one hand, or None.
+        """
+        if hand_no >= len(self.landmarks):
+            return None
+        return self.landmarks[hand_no]
+
     def find_position(self, img, hand_no=0, draw=True):
         """
         Finds the landmarks of a specific hand and returns them in a list.
@@ -35,94 +270,50 @@ class hand_detector():
             draw: Whether to draw the landmarks on the image.
 
         Returns:
-            A list of landmarks for the specified hand.
+            A list of [id, x, y] landmarks for the specified hand, built
+            once per frame from the cached landmark array.
         """
-        lm_list = []
-        if self.results.multi_hand_landmarks:
-            my_hand = self.results.multi_hand_landmarks[hand_no]
-            for id, lm in enumerate(my_hand.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append([id, cx, cy])
-
-            if draw:
-                self.mpDraw.draw_landmarks(img, my_hand, self.mp_hands.HAND_CONNECTIONS)
-        return lm_list
+        if hand_no >= len(self.landmarks):
+            return []
+        if self._lm_lists[hand_no] is None:
+            xy = self.landmarks[hand_no, :, :2].astype(np.int64)
+            self._lm_lists[hand_no] = np.column_stack((LANDMARK_IDS, xy)).tolist()
+        if draw:
+            self.draw_landmarks(img, hand_no)
+        return self._lm_lists[hand_no]
 
     def get_handedness(self):
-        handedness_list = []
-        if self.results.multi_hand_landmarks and self.results.multi_handedness:
-            for hand_handedness in self.results.multi_handedness:
-                handedness_dict = MessageToDict(hand_handedness)
-                handedness_list.append(handedness_dict['classification'][0]['label'])
-        return handedness_list
+        """
+        Returns the 'Left'/'Right' label of each detected hand. Use
+        handedness_codes for the 0/1 encoding the evaluators take.
+        """
+        return self._handedness_labels
     
     def get_bbox_location(self, img, hand_no=0, draw=True):
+        if hand_no >= len(self.landmarks):
+            return [], None, None
+
+        lm_list = self.find_position(img, hand_no, draw=False)
+        x_min, y_min, width, height = self.bboxes[hand_no].tolist()
+        bbox = (x_min, y_min, width, height)
+        mid = self.mids[hand_no].tolist()
+
+        if draw:
+            # First landmark at min x, max x, min y and max y
+            xy = self.landmarks[hand_no, :, :2].astype(np.int32)
+            extremes = (xy[:, 0].argmin(), xy[:, 0].argmax(), xy[:, 1].argmin(), xy[:, 1].argmax())
+            min_x, max_x, min_y, max_y = (tuple(xy[i].tolist()) for i in extremes)
+            cv2.rectangle(img, (x_min, y_min), (x_min + width, y_min + height), (255, 0, 0), 2)
+            cv2.line(img, min_x, max_x, (255,0,255), 2)
+            cv2.line(img, min_y, max_y, (255,0,255), 2)
 
-        lm_list = []
-        x_list = []
-        y_list = []
-
-        bbox = None
-        mid = None
-        
-        if self.results.multi_hand_landmarks:
-            for hand_index, my_hand in enumerate(self.results.multi_hand_landmarks):
-                if hand_index == hand_no:
-                    for id, lm in enumerate(my_hand.landmark):
-                        h,w,c = img.shape
-                        cx, cy = int(lm.x*w), int(lm.y*h)
-
-                        x_list.append(cx)
-                        y_list.append(cy)
-                        lm_list.append([id, cx, cy])
-
-                #calculate bbox
-                    x_min, x_max = min(x_list), max(x_list)
-                    y_min, y_max = min(y_list), max(y_list)
-
-                #add padding
-                    width = x_max - x_min
-                    height = y_max - y_min
-                    buffer_x = int(width * 0.1)  # 10% padding
-                    buffer_y = int(height * 0.1) # 10% padding
-                    x_min = max(0, x_min - buffer_x)
-                    y_min = max(0, y_min - buffer_y)
-                    x_max = x_max + buffer_x
-                    y_max = y_max + buffer_y
-                   
-                    x_min_coord = min(x_list)
-                    x_max_coord = max(x_list)
-                    y_min_coord = min(y_list)
-                    y_max_coord = max(y_list)
-
-                    lm_min_x = next(lm for lm in lm_list if lm[1] == x_min_coord)
-                    lm_max_x = next(lm for lm in lm_list if lm[1] == x_max_coord)
-
-                    lm_min_y = next(lm for lm in lm_list if lm[2] == y_min_coord)
-                    lm_max_y = next(lm for lm in lm_list if lm[2] == y_max_coord)
-                    
-                    idd, minxx, minxy = lm_min_x
-                    idd, minyx, minyy = lm_min_y
-                    idd, maxxx, maxxy = lm_max_x
-                    idd, maxyx, maxyy = lm_max_y
-                    
-
-                    mid = [(x_max - x_min)/2,(y_max - y_min)/2]
-
-
-
-
-
-                    bbox = (x_min, y_min, x_max - x_min, y_max - y_min)
-                    if draw:
-                        cv2.rectangle(img, (x_min, y_min), (x_max, y_max), (255, 0, 0), 2)
-                        cv2.line(img, (minxx, minxy), (maxxx, maxxy), (255,0,255), 2)
-                        cv2.line(img, (minyx, minyy), (maxyx, maxyy), (255,0,255), 2)
-
-                    return lm_list, bbox, mid
         return lm_list, bbox, mid
 
+    def close(self):
+        self.hands.close()
+        if self.roi_hands is not None:
+            self.roi_hands.close()
+
 
 def main():
     cap = cv2.VideoCapture(0)
@@ -0,0 +1,20 @@
+import time
+import numpy as np
+
+
+def latencies_us(predict, X, repeat=1):
+    """
+    Times predict on one row of X per call, as the games classify one
+    hand per frame, repeat times over X after one untimed warm-up call.
+    Returns every call's latency in microseconds.
+    """
+    X = np.asarray(X)
+    predict(X[:1])
+    times = []
+    for _ in range(repeat):
+        for row in X:
+            sample = row.reshape(1, -1)
+            start = time.perf_counter()
+            predict(sample)
+            times.append((time.perf_counter() - start) * 1e6)
+    return np.array(times)
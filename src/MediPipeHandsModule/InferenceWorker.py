@@ -0,0 +1,168 @@
+import multiprocessing as mp_proc
+from multiprocessing import shared_memory
+import mediapipe as mp
+import numpy as np
+from src.MediPipeHandsModule.HandTrackingModule import hand_detector
+
+
+class SharedFrameRing:
+    """
+    Fixed number of frame slots in a multiprocessing.shared_memory block.
+    Frames are copied in once by the producer and read in place by the
+    consumer, so full frames are never pickled between processes.
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        size = int(np.prod(self.shape)) * slots
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, img):
+        np.copyto(self.frames[slot], img)
+
+    def read(self, slot):
+        return self.frames[slot]
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(conn, ring_name, shape, slots, detector_kwargs):
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    detector = hand_detector(**detector_kwargs)
+    try:
+        while True:
+            request = conn.recv()
+            # Only the newest queued frame is worth processing; release the rest
+            while request is not None and conn.poll():
+                conn.send((request[0], request[1], None, None, None))
+                request = conn.recv()
+            if request is None:
+                break
+            seq, slot = request
+            landmarks, codes, scores = detector.detect(ring.read(slot))
+            conn.send((seq, slot, landmarks, codes, scores))
+    finally:
+        detector.close()
+        ring.close()
+
+
+class ProcessHandDetector(hand_detector):
+    """
+    hand_detector that runs MediaPipe in a separate worker process.
+
+    find_hands() copies the frame into a shared-memory ring slot and returns
+    straight away with the newest finished result, so detection overlaps
+    with capture and rendering instead of adding to every frame. Landmarks
+    may therefore lag the displayed frame by the worker's latency. Pass
+    wait=True to block until the submitted frame has been processed.
+    """
+
+    def __init__(self, mode=False, max_hands=2, detection_con=0.5, track_con=0.5, inference_size=None,
+                 roi_tracking=False, slots=3, wait=False):
+        self.mode = mode
+        self.max_hands = max_hands
+        self.detection_con = detection_con
+        self.track_con = track_con
+        self.inference_size = inference_size
+        # Applied by the worker's own detector to the frames it receives
+        self.roi_tracking = roi_tracking
+        self.slots = slots
+        self.wait = wait
+
+        self.mp_hands = mp.solutions.hands
+        self.init_landmark_cache()
+        self.frame_shape = None
+
+        self.ring = None
+        self.process = None
+        self.conn = None
+        self.seq = 0
+        self.result_seq = 0
+        self.frames_processed = 0
+        self.free_slots = []
+
+    def _start(self, shape):
+        self.close()
+        self.ring = SharedFrameRing(shape, self.slots)
+        self.free_slots = list(range(self.slots))
+        ctx = mp_proc.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        detector_kwargs = dict(mode=self.mode, max_hands=self.max_hands,
+                               detection_con=self.detection_con, track_con=self.track_con,
+                               roi_tracking=self.roi_tracking)
+        self.process = ctx.Process(target=_worker_main, name="HandInferenceWorker", daemon=True,
+                                   args=(child_conn, self.ring.name, shape, self.slots, detector_kwargs))
+        self.process.start()
+        child_conn.close()
+
+    def _collect(self, block=False):
+        block = block and len(self.free_slots) < self.slots
+        while self.conn.poll(None if block else 0):
+            seq, slot, landmarks, codes, scores = self.conn.recv()
+            self.free_slots.append(slot)
+            if landmarks is not None and seq > self.result_seq:
+                self.frames_processed += 1
+                self.result_seq = seq
+                # Landmarks are normalized, so they map onto the full frame
+                self.set_landmarks(landmarks, self.frame_shape)
+                self.set_handedness(codes, scores)
+            block = block and len(self.free_slots) < self.slots
+
+    def find_hands(self, img, draw=True):
+        # Downscaling before the copy also shrinks what goes through shared memory
+        small = self.prepare_frame(img)
+        if self.ring is None or self.ring.shape != small.shape:
+            self._start(small.shape)
+        self.frame_shape = img.shape
+
+        self._collect()
+        if self.free_slots:
+            slot = self.free_slots.pop(0)
+            self.ring.write(slot, small)
+            self.seq += 1
+            self.conn.send((self.seq, slot))
+            if self.wait:
+                self._collect(block=True)
+
+        if draw:
+            self.draw_landmarks(img)
+        return img
+
+    def close(self):
+        if self.process is not None:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.conn.close()
+            self.process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __del__(self):
+        self.close()
+
+
+def create_hand_detector(out_of_process=False, **kwargs):
+    """
+    Returns an in-process hand_detector or a ProcessHandDetector with the
+    same constructor arguments.
+    """
+    if out_of_process:
+        return ProcessHandDetector(**kwargs)
+    return hand_detector(**kwargs)
@@ -0,0 +1,69 @@
+import numpy as np
+
+# Gesture model input: handedness code (0=Left, 1=Right) followed by the 21
+# landmarks as wrist-relative x, y pairs scaled by the hand's bbox width and
+# height, i.e. [hand, lm0_x, lm0_y, ..., lm20_x, lm20_y].
+NUM_LANDMARKS = 21
+NUM_LANDMARK_FEATURES = 2 * NUM_LANDMARKS
+NUM_FEATURES = 1 + NUM_LANDMARK_FEATURES
+FEATURE_NAMES = ['hand'] + [f'lm{id}_{axis}' for id in range(NUM_LANDMARKS) for axis in 'xy']
+
+
+def landmark_features(xy, sizes, out=None):
+    """
+    Normalizes (N, 21, 2) pixel landmarks against their wrist and bbox
+    (N, 2) width and height in one pass. Writes the (N, 42) result into
+    out when given, so a caller can reuse one buffer every frame.
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    num_hands = len(xy)
+    if out is None:
+        out = np.empty((num_hands, NUM_LANDMARK_FEATURES))
+    relative = out.reshape(num_hands, NUM_LANDMARKS, 2)
+    np.subtract(xy, xy[:, :1], out=relative)
+    relative /= sizes[:, None, :]
+    return out
+
+
+def gesture_features(xy, sizes, handedness, out=None):
+    """
+    Builds (N, 43) model inputs from (N, 21, 2) pixel landmarks, (N, 2)
+    bbox sizes and N handedness codes, into out when given.
+    """
+    num_hands = len(xy)
+    if out is None:
+        out = np.empty((num_hands, NUM_FEATURES))
+    out[:, 0] = handedness
+    landmark_features(xy, sizes, out=out[:, 1:])
+    return out
+
+
+def features_from_lm_list(lm_list, bbox, handedness, out=None):
+    """
+    Builds one (1, 43) model input from a find_position-style [id, x, y]
+    list and an (x, y, width, height) bbox. Returns None when there are no
+    landmarks or the bbox is missing or empty.
+    """
+    if len(lm_list) == 0 or not bbox or not bbox[2] or not bbox[3]:
+        return None
+    xy = np.asarray(lm_list, dtype=np.float64)[None, :, 1:3]
+    return gesture_features(xy, (bbox[2:4],), handedness, out=out)
+
+
+def features_from_detector(detector, out=None):
+    """
+    Builds model inputs for every hand a hand_detector found in the
+    current frame, straight from its cached landmark and bbox arrays.
+    Returns (hand_numbers, features): hands with an empty bbox are left
+    out, and hand_numbers maps each feature row back to its hand_no.
+    """
+    sizes = detector.bboxes[:, 2:]
+    hand_numbers = np.flatnonzero((sizes > 0).all(axis=1))
+    xy = detector.landmarks[:, :, :2]
+    codes = detector.handedness_codes[:len(xy)]
+    if len(hand_numbers) < len(xy):
+        xy, sizes, codes = xy[hand_numbers], sizes[hand_numbers], codes[hand_numbers]
+    if out is not None:
+        out = out[:len(xy)]
+    return hand_numbers, gesture_features(xy, sizes, codes, out=out)
@@ -0,0 +1,170 @@
+import os
+import time
+import numpy as np
+from src.MediPipeHandsModule.LandmarkFeatures import gesture_features
+
+# Landmark-stream file: a 64-byte header followed by one fixed-size record per
+# frame, appended as frames are processed. Landmarks are full-frame pixel x, y
+# and raw z, as cached on hand_detector.landmarks.
+STREAM_SUFFIX = '.landmarks'
+STREAM_MAGIC = b'HGLMARK1'
+STREAM_HEADER = np.dtype([('magic', 'S8'), ('max_hands', '<u4'), ('width', '<u4'),
+                          ('height', '<u4'), ('reserved', 'u1', (44,))])
+
+
+def stream_dtype(max_hands=2):
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('frame', '<u4'),
+        ('num_hands', 'u1'),
+        ('handedness', 'i1', (max_hands,)),
+        ('score', '<f4', (max_hands,)),
+        ('landmarks', '<f4', (max_hands, 21, 3)),
+        ('bbox', '<i4', (max_hands, 4)),
+    ])
+
+
+def read_header(path):
+    header = np.fromfile(path, dtype=STREAM_HEADER, count=1)
+    if not len(header) or header[0]['magic'] != STREAM_MAGIC:
+        raise ValueError(f'{path} is not a landmark-stream file')
+    return header[0]
+
+
+class LandmarkRecorder:
+    """
+    Appends every frame's landmarks, handedness, bboxes and timestamp from
+    a hand_detector to a landmark-stream file. Frames without hands are
+    recorded too (num_hands=0), so the stream keeps the session's timing.
+    Hands beyond max_hands are dropped. Appending to an existing file
+    continues its frame numbering.
+    """
+
+    def __init__(self, path, max_hands=2):
+        self.path = path
+        self.max_hands = max_hands
+        self.frames_written = 0
+        self._next_frame = 0
+        self._file = None
+        self._record = None
+
+    def _open(self, shape):
+        h, w = shape[:2]
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= STREAM_HEADER.itemsize:
+            header = read_header(self.path)
+            if int(header['max_hands']) != self.max_hands:
+                raise ValueError(f'{self.path} holds {int(header["max_hands"])} hands per record, '
+                                 f'cannot append {self.max_hands}')
+            self._file = open(self.path, 'r+b')
+            # Drop a partial record left by an interrupted session, then
+            # number on from the last whole one
+            dtype = stream_dtype(self.max_hands)
+            records = (os.path.getsize(self.path) - STREAM_HEADER.itemsize) // dtype.itemsize
+            self._file.truncate(STREAM_HEADER.itemsize + records * dtype.itemsize)
+            if records:
+                self._file.seek(STREAM_HEADER.itemsize + (records - 1) * dtype.itemsize)
+                last = np.frombuffer(self._file.read(dtype.itemsize), dtype=dtype)[0]
+                self._next_frame = int(last['frame']) + 1
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(self.path, 'wb')
+            header = np.zeros(1, dtype=STREAM_HEADER)
+            header['magic'] = STREAM_MAGIC
+            header['max_hands'], header['width'], header['height'] = self.max_hands, w, h
+            self._file.write(header.tobytes())
+        self._record = np.zeros(1, dtype=stream_dtype(self.max_hands))
+
+    def write(self, detector, shape, timestamp=None):
+        """
+        Records the detector's current frame. shape is the frame's shape,
+        used for the header when the file is created.
+        """
+        if self._file is None:
+            self._open(shape)
+        num_hands = min(len(detector.landmarks), self.max_hands)
+        record = self._record[0]
+        record['timestamp'] = time.monotonic() if timestamp is None else timestamp
+        record['frame'] = self._next_frame
+        record['num_hands'] = num_hands
+        record['handedness'] = -1
+        record['score'] = 0
+        record['landmarks'] = 0
+        record['bbox'] = 0
+        if num_hands:
+            record['handedness'][:num_hands] = detector.handedness_codes[:num_hands]
+            record['score'][:num_hands] = detector.handedness_scores[:num_hands]
+            record['landmarks'][:num_hands] = detector.landmarks[:num_hands]
+            record['bbox'][:num_hands] = detector.bboxes[:num_hands]
+        self._file.write(self._record.tobytes())
+        self.frames_written += 1
+        self._next_frame += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LandmarkStream:
+    """
+    Read-only memory map of a landmark-stream file as a NumPy structured
+    array, so long sessions can be sliced and analysed without parsing or
+    loading the whole file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = read_header(path)
+        self.max_hands = int(header['max_hands'])
+        self.frame_size = (int(header['width']), int(header['height']))
+        dtype = stream_dtype(self.max_hands)
+        # Whole records only; an interrupted session may end in a partial one
+        count = (os.path.getsize(path) - STREAM_HEADER.itemsize) // dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=STREAM_HEADER.itemsize, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def frames_with_hand(self, hand_no=0):
+        """
+        Indices of the records that have a hand at position hand_no.
+        """
+        return np.flatnonzero(self.records['num_hands'] > hand_no)
+
+    def lm_list(self, index, hand_no=0):
+        """
+        One recorded hand as the [id, x, y] list find_position returns.
+        """
+        xy = self.records['landmarks'][index, hand_no, :, :2].astype(np.int64)
+        return [[id, x, y] for id, (x, y) in enumerate(xy.tolist())]
+
+    def features(self, hand_no=0):
+        """
+        Returns (indices, features) for every record with a hand at
+        hand_no, with features laid out like the gesture models expect:
+        handedness code then 21 wrist-relative x, y pairs scaled by the
+        bbox width and height.
+        """
+        indices = self.frames_with_hand(hand_no)
+        features = gesture_features(self.records['landmarks'][indices, hand_no, :, :2],
+                                    self.records['bbox'][indices, hand_no, 2:],
+                                    self.records['handedness'][indices, hand_no])
+        return indices, features
+
+    def replay(self, evaluator, hand_no=0):
+        """
+        Feeds every recorded hand through a GestureEvaluator the way the
+        games do, yielding (timestamp, gesture).
+        """
+        for index in self.frames_with_hand(hand_no):
+            record = self.records[index]
+            gesture = evaluator.evaluate(self.lm_list(index, hand_no),
+                                         int(record['handedness'][hand_no]),
+                                         record['bbox'][hand_no].tolist())
+            yield float(record['timestamp']), gesture
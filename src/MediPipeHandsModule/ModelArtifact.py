@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from src.MediPipeHandsModule.CompiledForest import CompiledForest, compile_forest
+from src.MediPipeHandsModule.CompiledKNN import CompiledKNN, compile_knn
+from src.MediPipeHandsModule.DistilledModel import DistilledMLP
+
+# Model artifact file: 8-byte magic, little-endian uint32 header length, a
+# JSON header, then every array as raw bytes at a 64-byte aligned offset.
+# The header holds the model kind, free-form metadata (feature schema,
+# label map, training data hash) and each array's dtype, shape and offset
+# from the start of the data section. Arrays are memory-mapped on access,
+# so opening an artifact reads only the header and processes loading the
+# same file share its pages.
+ARTIFACT_SUFFIX = '.gmodel'
+ARTIFACT_MAGIC = b'HGMODEL1'
+ALIGNMENT = 64
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def file_hash(path):
+    """
+    sha256 of a file, recorded as the training data hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_artifact(path, kind, arrays, metadata=None):
+    """
+    Writes a dict of name -> array to path with the given kind and
+    JSON-serialisable metadata.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({'kind': kind, 'metadata': metadata or {}, 'arrays': entries}).encode()
+    data_start = _aligned(len(ARTIFACT_MAGIC) + 4 + len(header))
+    with open(path, 'wb') as f:
+        f.write(ARTIFACT_MAGIC)
+        f.write(np.uint32(len(header)).astype('<u4').tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]['offset'])
+            f.write(array.tobytes())
+        # Pad the last array so the file ends on the alignment boundary
+        f.truncate(data_start + offset)
+
+
+class ModelArtifact:
+    """
+    Opens a model artifact. Only the header is read here; arrays are
+    mapped read-only the first time they are indexed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(ARTIFACT_MAGIC)) != ARTIFACT_MAGIC:
+                raise ValueError(f'{path} is not a model artifact')
+            header_length = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+            header = json.loads(f.read(header_length))
+        self.kind = header['kind']
+        self.metadata = header['metadata']
+        self.entries = header['arrays']
+        self.data_start = _aligned(len(ARTIFACT_MAGIC) + 4 + header_length)
+        self._arrays = {}
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __getitem__(self, name):
+        if name not in self._arrays:
+            entry = self.entries[name]
+            shape = tuple(entry['shape'])
+            if not np.prod(shape, dtype=np.int64):
+                # np.memmap cannot map zero bytes
+                self._arrays[name] = np.zeros(shape, dtype=entry['dtype'])
+            else:
+                self._arrays[name] = np.memmap(self.path, dtype=entry['dtype'], mode='r',
+                                               offset=self.data_start + entry['offset'], shape=shape)
+        return self._arrays[name]
+
+
+def _portable_path(path):
+    # Artifacts are committed, so record paths relative to the repository
+    # (or just the file name for files outside it), never this machine's
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    try:
+        inside = os.path.commonpath((path, PROJECT_ROOT)) == PROJECT_ROOT
+    except ValueError:
+        # On another drive (Windows)
+        inside = False
+    if not inside:
+        return os.path.basename(path)
+    return os.path.relpath(path, PROJECT_ROOT).replace(os.sep, '/')
+
+
+def _base_metadata(model_path, data_path, feature_schema, labels):
+    metadata = {
+        'feature_schema': list(feature_schema) if feature_schema is not None else None,
+        'labels': [label.item() if hasattr(label, 'item') else label for label in labels],
+        'source_model': _portable_path(model_path),
+        'exported': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    if data_path:
+        metadata['training_data'] = _portable_path(data_path)
+        metadata['data_hash'] = file_hash(data_path)
+    return metadata
+
+
+def export_forest(model, path, model_path=None, data_path=None, feature_schema=None):
+    """
+    Compiles a fitted RandomForestClassifier (see CompiledForest) and
+    writes its node arrays as a 'forest' artifact.
+    """
+    forest = model if isinstance(model, CompiledForest) else compile_forest(model)
+    if feature_schema is None and hasattr(model, 'feature_names_in_'):
+        feature_schema = model.feature_names_in_.tolist()
+    metadata = _base_metadata(model_path, data_path, feature_schema, forest.classes_)
+    metadata.update(depth=int(forest.depth), n_features=int(forest.n_features_in_))
+    write_artifact(path, 'forest', {
+        'feature': forest.feature,
+        'threshold': forest.threshold,
+        'children': forest.children,
+        'leaf_proba': forest.leaf_proba,
+        'roots': forest.roots,
+        'classes': np.asarray(forest.classes_),
+    }, metadata)
+
+
+def export_knn(model, path, model_path=None, data_path=None, feature_schema=None):
+    """
+    Writes a fitted KNeighborsClassifier's training set (see CompiledKNN)
+    as a 'knn' artifact. The search index is chosen when it is loaded.
+    """
+    knn = compile_knn(model) if not isinstance(model, CompiledKNN) else model
+    if knn.index == 'prototypes':
+        raise ValueError('export the full training set, not its prototypes')
+    if feature_schema is None and hasattr(model, 'feature_names_in_'):
+        feature_schema = model.feature_names_in_.tolist()
+    metadata = _base_metadata(model_path, data_path, feature_schema, knn.classes_)
+    metadata.update(n_neighbors=int(knn.k), weights=knn.weights)
+    write_artifact(path, 'knn', {
+        'points': knn.points,
+        'codes': knn.codes,
+        'classes': np.asarray(knn.classes_),
+    }, metadata)
+
+
+def export_mlp(model, path, model_path=None, data_path=None, feature_schema=None, metadata=None):
+    """
+    Writes a DistilledMLP's weight arrays as an 'mlp' artifact. metadata
+    is merged in, e.g. the teacher model and the measured accuracy.
+    """
+    base = _base_metadata(model_path, data_path, feature_schema, model.classes_)
+    base.update(metadata or {})
+    base.update(layers=len(model.weights), n_features=int(model.n_features_in_))
+    arrays = {}
+    for layer, (w, b) in enumerate(zip(model.weights, model.biases)):
+        arrays[f'weight{layer}'] = w
+        arrays[f'bias{layer}'] = b
+    arrays['classes'] = np.asarray(model.classes_)
+    write_artifact(path, 'mlp', arrays, base)
+
+
+def export_cnn(model, path, model_path=None, data_path=None, feature_schema=None, labels=None):
+    """
+    Writes a CNN's state dict as a 'cnn' artifact. labels are the class
+    values behind output indices 0..num_classes-1, when known.
+    """
+    state = {name: tensor.detach().cpu().numpy() for name, tensor in model.state_dict().items()}
+    num_classes = int(model.fc2.out_features)
+    metadata = _base_metadata(model_path, data_path, feature_schema,
+                              labels if labels is not None else range(num_classes))
+    metadata.update(num_classes=num_classes, width=int(model.conv1.out_channels))
+    write_artifact(path, 'cnn', state, metadata)
+
+
+def load_model(path):
+    """
+    Builds the model stored in an artifact: a CompiledForest over the
+    mapped arrays for 'forest', a brute-force CompiledKNN for 'knn', a
+    DistilledMLP for 'mlp', or a CNN in eval mode for 'cnn'.
+    """
+    artifact = ModelArtifact(path)
+    if artifact.kind == 'forest':
+        return CompiledForest(
+            feature=artifact['feature'],
+            threshold=artifact['threshold'],
+            children=artifact['children'],
+            leaf_proba=artifact['leaf_proba'],
+            roots=artifact['roots'],
+            depth=artifact.metadata['depth'],
+            classes=np.array(artifact['classes']),
+            n_features=artifact.metadata['n_features'],
+        )
+    if artifact.kind == 'knn':
+        return CompiledKNN(
+            points=artifact['points'],
+            codes=artifact['codes'],
+            classes=np.array(artifact['classes']),
+            n_neighbors=artifact.metadata['n_neighbors'],
+            weights=artifact.metadata['weights'],
+        )
+    if artifact.kind == 'mlp':
+        layers = range(artifact.metadata['layers'])
+        return DistilledMLP(
+            weights=[artifact[f'weight{layer}'] for layer in layers],
+            biases=[artifact[f'bias{layer}'] for layer in layers],
+            classes=np.array(artifact['classes']),
+        )
+    if artifact.kind == 'cnn':
+        import torch
+        from src.MediPipeHandsModule.CNNModel import CNN
+
+        # Artifacts written before CNN had a width hold the default 16
+        model = CNN(num_classes=artifact.metadata['num_classes'], width=artifact.metadata.get('width', 16))
+        # Copy out of the read-only map; torch parameters must be writable
+        model.load_state_dict({name: torch.from_numpy(np.array(artifact[name])) for name in artifact.entries})
+        model.eval()
+        return model
+    raise ValueError(f'unknown model kind in {path}: {artifact.kind}')
@@ -0,0 +1,69 @@
+import os
+import time
+import joblib
+from src.MediPipeHandsModule.CompiledKNN import compile_knn
+from src.MediPipeHandsModule.ModelArtifact import ARTIFACT_SUFFIX, export_knn, load_model
+
+
+class OnlineGestureModel:
+    """
+    A brute-force CompiledKNN that labelled captures are folded into one at
+    a time (CompiledKNN.partial_fit: an append, no retraining), republished
+    as a 'knn' artifact at path after every publish_interval seconds of
+    updates. A game running the 'online' backend watches path and picks up
+    each new version.
+
+    Starts from path when it exists, so calibration carries across capture
+    sessions, otherwise from the KNN model at base (artifact or pickle).
+    """
+
+    def __init__(self, path, base, publish_interval=0.0, resume=True):
+        self.path = path
+        self.publish_interval = publish_interval
+        source = path if resume and os.path.exists(path) else base
+        model = load_model(source) if source.endswith(ARTIFACT_SUFFIX) else joblib.load(source)
+        self.knn = compile_knn(model, 'brute')
+        self.source = source
+        self.added = 0
+        self.published = 0
+        self._dirty = False
+        self._last_publish = 0.0
+
+    def __len__(self):
+        return len(self.knn.points)
+
+    def add(self, features, label):
+        """
+        Folds one (43,) feature row (handedness code followed by the
+        normalized landmarks) in under label, publishing if due. Returns
+        True when it published.
+        """
+        self.knn.partial_fit(features, [label])
+        self.added += 1
+        self._dirty = True
+        if time.monotonic() - self._last_publish >= self.publish_interval:
+            return self.publish()
+        return False
+
+    def publish(self):
+        """
+        Writes the model to path. Returns False if the file could not be
+        replaced (Windows refuses while a reader has it mapped); the update
+        is published with the next one instead.
+        """
+        # Written under a temporary name and swapped in, so a watching game
+        # never loads half a file
+        temporary = self.path + '.tmp'
+        export_knn(self.knn, temporary, model_path=self.source)
+        try:
+            os.replace(temporary, self.path)
+        except PermissionError:
+            return False
+        self.published += 1
+        self._dirty = False
+        self._last_publish = time.monotonic()
+        return True
+
+    def close(self):
+        if self._dirty:
+            self.publish()
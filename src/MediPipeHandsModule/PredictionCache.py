@@ -0,0 +1,97 @@
+import time
+import numpy as np
+from src.MediPipeHandsModule.LandmarkFeatures import features_from_lm_list
+
+
+class PredictionCache:
+    """
+    Sits in front of a GestureEvaluator (or GestureEvaluatorCNN) and
+    returns the last prediction while the new features stay within
+    tolerance of the features it was computed for, so a held gesture is
+    not reclassified every frame.
+
+    Distance is the largest absolute difference over the normalized
+    features (handedness included, so a hand switch always misses).
+    Features are compared with the ones the cached prediction was made
+    from, not the previous frame, so slow drift still forces a rerun, and
+    a cached prediction is never reused for longer than max_age seconds.
+
+    Exposes the rest of the evaluator's API unchanged, so it can be passed
+    anywhere an evaluator is expected.
+    """
+
+    def __init__(self, evaluator, tolerance=0.02, max_age=0.25):
+        self.evaluator = evaluator
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self._features = None
+        self._result = None
+        self._time = 0.0
+        self._kind = None
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def __getattr__(self, name):
+        return getattr(self.evaluator, name)
+
+    def _lookup(self, kind, features, now):
+        if self._kind != kind or self._features is None or self._features.shape != features.shape:
+            return None
+        if now - self._time > self.max_age:
+            self.expired += 1
+            return None
+        if np.abs(features - self._features).max(initial=0.0) > self.tolerance:
+            return None
+        self.hits += 1
+        return self._result
+
+    def _store(self, kind, features, result, now):
+        self.misses += 1
+        self._kind = kind
+        self._features = features.copy()
+        self._result = result
+        self._time = now
+        return result
+
+    def evaluate(self, landmarks, handedness, bbox, timestamp=None):
+        now = time.monotonic() if timestamp is None else timestamp
+        if isinstance(handedness, str):
+            handedness = 1 if handedness == 'Right' else 0
+        features = features_from_lm_list(landmarks, bbox, int(handedness))
+        if features is None:
+            return self.evaluator.evaluate(landmarks, handedness, bbox)
+        cached = self._lookup('single', features, now)
+        if cached is not None:
+            return cached
+        return self._store('single', features, self.evaluator.evaluate(landmarks, handedness, bbox), now)
+
+    def evaluate_batch(self, features, handedness=None, timestamp=None):
+        now = time.monotonic() if timestamp is None else timestamp
+        key = np.asarray(features, dtype=np.float64)
+        if handedness is not None:
+            key = np.column_stack((np.asarray(handedness, dtype=np.float64), key.reshape(len(key), -1)))
+        cached = self._lookup('batch', key, now)
+        if cached is not None:
+            return cached
+        return self._store('batch', key, self.evaluator.evaluate_batch(features, handedness), now)
+
+    def clear(self):
+        self._features = None
+        self._result = None
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'tolerance': self.tolerance,
+            'max_age': self.max_age,
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'hit_rate': self.hit_rate,
+        }
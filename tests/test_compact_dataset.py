@@ -0,0 +1,44 @@
+import csv
+import os
+import sys
+import numpy as np
+import pytest
+
+project_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, 'scripts'))
+
+from compact_dataset import compact
+
+
+@pytest.fixture
+def capture_csv(tmp_path):
+    # Base hands plus jittered copies, so near-duplicates straddle cell edges
+    rng = np.random.default_rng(0)
+    base = rng.uniform(-0.5, 0.5, (60, 42))
+    base[:, :2] = 0.0
+    rows = np.repeat(base, 8, axis=0)
+    rows[:, 2:] += rng.normal(0.0, 0.002, rows[:, 2:].shape)
+    labels = np.repeat(rng.integers(1, 5, len(base)), 8)
+    hands = np.repeat(rng.choice(['left', 'right'], len(base)), 8)
+    order = rng.permutation(len(rows))
+    rows, labels, hands = rows[order], labels[order], hands[order]
+
+    path = tmp_path / 'gestures.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for label, hand, values in zip(labels.tolist(), hands, rows.tolist()):
+            writer.writerow([label, hand] + values)
+    return str(path)
+
+
+@pytest.mark.parametrize('grids', [1, 4])
+def test_compact_does_not_depend_on_chunk_size(capture_csv, tmp_path, grids):
+    outputs = []
+    for chunk_rows in (4096, 7, 1):
+        out = str(tmp_path / f'compact-{chunk_rows}.csv')
+        _, after, dropped, _, _ = compact(capture_csv, out, 0.1, grids, 1.0, None, chunk_rows, 0)
+        with open(out) as f:
+            outputs.append(f.read())
+        assert dropped > 0
+    assert outputs[0] == outputs[1] == outputs[2]